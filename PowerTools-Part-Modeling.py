@@ -20,5 +20,8 @@ def stop(context):
         # This will run the start function in each of your commands as defined in commands/__init__.py
         commands.stop()
 
+        # Release the shared cache database so its WAL is checkpointed.
+        futil.close_cache_store()
+
     except:
         futil.handle_error('stop')
\ No newline at end of file
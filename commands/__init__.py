@@ -7,6 +7,10 @@ from .sketchcirclecenterpoint import entry as sketchcirclecenterpoint
 from .timelinecompute import entry as timelinecompute
 from .mirrorderive import entry as mirrorderive
 from .hideobjects import entry as hideobjects
+from .restorevisibility import entry as restorevisibility
+from .sketchrepairall import entry as sketchrepairall
+from .sketchaudit import entry as sketchaudit
+from .sketchprofiler import entry as sketchprofiler
 
 # Fusion will automatically call the start() and stop() functions.
 commands = [
@@ -16,6 +20,10 @@ commands = [
     timelinecompute,
     mirrorderive,
     hideobjects,
+    restorevisibility,
+    sketchrepairall,
+    sketchaudit,
+    sketchprofiler,
 ]
 
 
@@ -7,6 +7,7 @@ import os
 
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from . import visibility
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -29,6 +30,35 @@ ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource
 
 local_handlers = []
 
+# Checkbox input ids and labels, one per hideable object category.
+CATEGORY_LABELS = {
+    "hide_origin": "Origin",
+    "hide_construction_points": "Construction Points",
+    "hide_construction_axes": "Construction Axes",
+    "hide_construction_planes": "Construction Planes",
+    "hide_joint_origins": "Joint Origins",
+    "hide_joints": "Joints",
+    "hide_sketches": "Sketches",
+    "hide_canvas": "Canvas",
+}
+CATEGORY_IDS = tuple(CATEGORY_LABELS)
+
+NO_PRESET = "(None)"
+
+# Object types that can be forced visible or hidden by a preset override.
+OVERRIDE_FILTERS = (
+    "ConstructionPoints",
+    "ConstructionLines",
+    "ConstructionPlanes",
+    "JointOrigins",
+    "Sketches",
+)
+
+# Commands that never change the set of hideable objects, so the cached
+# visibility inventory survives them. Our own commands keep its counts
+# current through visibility.note_changes().
+INDEX_SAFE_COMMANDS = {CMD_ID, "PTPM-restorevisibility", "SelectCommand"}
+
 
 def start() -> None:
     try:
@@ -37,6 +67,11 @@ def start() -> None:
         )
         futil.add_handler(cmd_def.commandCreated, command_created)
 
+        # Any command that may add or delete objects invalidates the cached
+        # visibility inventory for the active document.
+        futil.add_handler(ui.commandTerminated, application_command_terminated)
+        futil.add_handler(app.documentClosed, application_document_closed)
+
         workspace = ui.workspaces.itemById(WORKSPACE_ID)
         if not workspace:
             futil.log(f"Warning: Workspace {WORKSPACE_ID} not found")
@@ -97,24 +132,61 @@ def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
         cmd = args.command
         inputs = cmd.commandInputs
 
-        inputs.addBoolValueInput("hide_origin", "Origin", True, "", True)
-        inputs.addBoolValueInput(
-            "hide_construction_points", "Construction Points", True, "", True
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        counts = _visible_counts(design) if design else {}
+
+        for input_id in CATEGORY_IDS:
+            label = CATEGORY_LABELS[input_id]
+            if input_id in counts:
+                label = f"{label} ({counts[input_id]:,} visible)"
+            inputs.addBoolValueInput(input_id, label, True, "", True)
+
+        scope_sel = inputs.addSelectionInput(
+            "scope_occurrences",
+            "Only under",
+            "Limit hiding to these occurrences and their sub-assemblies. "
+            "Leave empty to hide in every component.",
+        )
+        scope_sel.addSelectionFilter("Occurrences")
+        scope_sel.setSelectionLimits(0, 0)
+
+        preset_names = visibility.list_presets(design) if design else []
+
+        presets = inputs.addGroupCommandInput("presets", "Presets")
+        presets.isExpanded = bool(preset_names)
+        preset_inputs = presets.children
+
+        preset_list = preset_inputs.addDropDownCommandInput(
+            "preset",
+            "Preset",
+            adsk.core.DropDownStyles.TextListDropDownStyle,
         )
-        inputs.addBoolValueInput(
-            "hide_construction_axes", "Construction Axes", True, "", True
+        preset_list.listItems.add(NO_PRESET, True, "")
+        for name in preset_names:
+            preset_list.listItems.add(name, False, "")
+
+        show_sel = preset_inputs.addSelectionInput(
+            "override_show", "Always show", "Objects to keep visible"
         )
-        inputs.addBoolValueInput(
-            "hide_construction_planes", "Construction Planes", True, "", True
+        hide_sel = preset_inputs.addSelectionInput(
+            "override_hide", "Always hide", "Objects to hide regardless of category"
         )
-        inputs.addBoolValueInput("hide_joint_origins", "Joint Origins", True, "", True)
-        inputs.addBoolValueInput("hide_joints", "Joints", True, "", True)
-        inputs.addBoolValueInput("hide_sketches", "Sketches", True, "", True)
-        inputs.addBoolValueInput("hide_canvas", "Canvas", True, "", True)
+        for sel in (show_sel, hide_sel):
+            for selection_filter in OVERRIDE_FILTERS:
+                sel.addSelectionFilter(selection_filter)
+            sel.setSelectionLimits(0, 0)
+
+        preset_inputs.addStringValueInput("preset_name", "Save as preset", "")
+        preset_inputs.addBoolValueInput("delete_preset", "Delete preset", False, "", False)
 
         futil.add_handler(
             args.command.execute, command_execute, local_handlers=local_handlers
         )
+        futil.add_handler(
+            args.command.inputChanged,
+            command_input_changed,
+            local_handlers=local_handlers,
+        )
         futil.add_handler(
             args.command.destroy, command_destroy, local_handlers=local_handlers
         )
@@ -123,6 +195,99 @@ def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
         futil.log(f"Error in command_created: {e}")
 
 
+def _progress_reporter(progress: adsk.core.ProgressDialog, phase: str):
+    """Return a chunk callback that updates *progress*, pumps events and
+    returns False once the user has clicked Cancel."""
+
+    def report(done: int, total: int) -> bool:
+        progress.message = f"{phase} %v of %m"
+        progress.maximumValue = max(total, 1)
+        progress.progressValue = done
+        adsk.doEvents()
+        return not progress.wasCancelled
+
+    return report
+
+
+def _visible_counts(design: adsk.fusion.Design) -> dict[str, int]:
+    """Return visible counts per category from the cached inventory.
+
+    The inventory is built once per document (with a cancellable progress
+    dialog on first use) and reused on later dialog opens.
+    """
+    inventory = visibility.get_inventory(design, build=False)
+    if inventory is None:
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show(CMD_NAME, "Indexing components...", 0, 1, 1)
+        try:
+            inventory = visibility.get_inventory(
+                design, _progress_reporter(progress, "Indexing components")
+            )
+        finally:
+            progress.hide()
+    return dict(inventory.visible_counts) if inventory is not None else {}
+
+
+def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
+    inputs = args.inputs
+    design = adsk.fusion.Design.cast(app.activeProduct)
+    if not design:
+        return
+
+    if args.input.id == "preset":
+        name = inputs.itemById("preset").selectedItem.name
+        if name != NO_PRESET:
+            _load_preset_into_inputs(design, name, inputs)
+
+    elif args.input.id == "delete_preset":
+        preset_list = inputs.itemById("preset")
+        selected = preset_list.selectedItem
+        if selected is None or selected.name == NO_PRESET:
+            return
+        visibility.delete_preset(design, selected.name)
+        selected.deleteMe()
+        preset_list.listItems.item(0).isSelected = True
+
+
+def _load_preset_into_inputs(
+    design: adsk.fusion.Design, name: str, inputs: adsk.core.CommandInputs
+) -> None:
+    """Copy a saved preset's categories and overrides into the dialog."""
+    preset = visibility.read_preset(design, name)
+    if preset is None:
+        return
+
+    for input_id, value in preset.get("categories", {}).items():
+        checkbox = inputs.itemById(input_id)
+        if checkbox is not None:
+            checkbox.value = bool(value)
+
+    show_sel = inputs.itemById("override_show")
+    hide_sel = inputs.itemById("override_hide")
+    show_sel.clearSelection()
+    hide_sel.clearSelection()
+    for token, visible in preset.get("overrides", []):
+        found = design.findEntityByToken(token)
+        if found:
+            (show_sel if visible else hide_sel).addSelection(found[0])
+
+
+def _read_overrides(
+    inputs: adsk.core.CommandInputs,
+) -> list[tuple[adsk.core.Base, bool]]:
+    """Return (native object, visible) for every object in the override selections."""
+    overrides = []
+    for input_id, visible in (("override_show", True), ("override_hide", False)):
+        sel = inputs.itemById(input_id)
+        for i in range(sel.selectionCount):
+            entity = sel.selection(i).entity
+            # Visibility is a component-level flag; resolve assembly proxies.
+            native = getattr(entity, "nativeObject", None) or entity
+            overrides.append((native, visible))
+    return overrides
+
+
 def command_execute(args: adsk.core.CommandEventArgs) -> None:
     try:
         app = adsk.core.Application.get()
@@ -134,52 +299,144 @@ def command_execute(args: adsk.core.CommandEventArgs) -> None:
             return
 
         inputs = args.command.commandInputs
-        hide_origin = inputs.itemById("hide_origin").value
-        hide_construction_points = inputs.itemById("hide_construction_points").value
-        hide_construction_axes = inputs.itemById("hide_construction_axes").value
-        hide_construction_planes = inputs.itemById("hide_construction_planes").value
-        hide_joint_origins = inputs.itemById("hide_joint_origins").value
-        hide_joints = inputs.itemById("hide_joints").value
-        hide_sketches = inputs.itemById("hide_sketches").value
-        hide_canvas = inputs.itemById("hide_canvas").value
-
-        all_components = design.allComponents
+        categories = {
+            input_id: inputs.itemById(input_id).value for input_id in CATEGORY_IDS
+        }
+        overrides = _read_overrides(inputs)
+
+        scope_sel = inputs.itemById("scope_occurrences")
+        scope = [
+            adsk.fusion.Occurrence.cast(scope_sel.selection(i).entity)
+            for i in range(scope_sel.selectionCount)
+        ]
+
+        preset_name = inputs.itemById("preset_name").value.strip()
+
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show(CMD_NAME, "Indexing components...", 0, 1, 0)
+        try:
+            summary = _hide_with_progress(
+                design, categories, overrides, scope, progress
+            )
+        finally:
+            progress.hide()
 
-        for component in all_components:
-            if hide_origin:
-                component.isOriginFolderLightBulbOn = False
+        if summary is None:
+            ui.messageBox("Cancelled before any visibility was changed.", CMD_NAME)
+            return
+        applied, planned, examined, override_applied, cancelled = summary
+
+        if preset_name and not cancelled:
+            visibility.write_preset(
+                design,
+                preset_name,
+                categories,
+                [(obj.entityToken, visible) for obj, visible in overrides],
+            )
 
-            if hide_construction_points:
-                for cp in component.constructionPoints:
-                    cp.isLightBulbOn = False
+        skipped = examined - planned
+        futil.log(
+            f"{CMD_NAME}: examined {examined} objects, wrote {applied} of {planned}, "
+            f"skipped {skipped} already in the requested state, "
+            f"applied {override_applied} of {len(overrides)} overrides"
+            f"{' (cancelled)' if cancelled else ''}."
+        )
+        if cancelled:
+            message = (
+                f"Cancelled after changing {applied:,} of {planned:,} objects.\n"
+                "Run Restore Visibility to undo the changes made so far."
+            )
+        else:
+            # Only the unscoped Sketches option turns a flag on (the sketch
+            # folder); everything else the plan touches is being hidden.
+            if categories["hide_sketches"] and not scope:
+                state = "already in the requested state"
+            else:
+                state = "already hidden"
+            message = (
+                f"Changed visibility of {applied:,} objects.\n"
+                f"{skipped:,} objects were {state} and were left untouched."
+            )
+            if override_applied:
+                message += f"\nApplied {override_applied:,} per-object overrides."
+            if preset_name:
+                message += f"\nSaved preset \"{preset_name}\"."
+        ui.messageBox(message, CMD_NAME)
 
-            if hide_construction_axes:
-                for ca in component.constructionAxes:
-                    ca.isLightBulbOn = False
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
 
-            if hide_construction_planes:
-                for cl in component.constructionPlanes:
-                    cl.isLightBulbOn = False
 
-            if hide_joint_origins:
-                for jo in component.jointOrigins:
-                    jo.isLightBulbOn = False
+def _hide_with_progress(
+    design: adsk.fusion.Design,
+    categories: dict[str, bool],
+    overrides: list[tuple[adsk.core.Base, bool]],
+    scope: list[adsk.fusion.Occurrence],
+    progress: adsk.core.ProgressDialog,
+) -> tuple[int, int, int, int, bool] | None:
+    """Index, plan and apply in chunks, pumping events between chunks.
 
-            if hide_joints:
-                component.isJointsFolderLightBulbOn = False
+    With a non-empty *scope*, only the subtrees of those occurrences are
+    planned, resolved through the inventory's occurrence-path index.
 
-            if hide_sketches:
-                component.isSketchFolderLightBulbOn = True
-                for sketch in component.sketches:
-                    sketch.isLightBulbOn = False
+    Returns (applied, planned, examined, overrides applied, cancelled), or
+    None when cancelled before anything was written. Only the changes that
+    were actually written are recorded in the snapshot.
+    """
 
-            if hide_canvas:
-                component.isCanvasFolderLightBulbOn = False
+    def on_chunk(phase: str):
+        return _progress_reporter(progress, phase)
 
-        futil.log(f"{CMD_NAME} executed successfully.")
+    inventory = visibility.get_inventory(design, on_chunk("Indexing components"))
+    if inventory is None:
+        return None
 
-    except Exception:
-        futil.handle_error(CMD_NAME, show_message_box=True)
+    # Read first, then write only the objects whose state actually
+    # changes – every write is an API call and may trigger a redraw.
+    if scope:
+        plan = visibility.plan_occurrence_changes(
+            inventory, design, scope, categories, on_chunk("Checking occurrences")
+        )
+    else:
+        plan = visibility.plan_visibility_changes(
+            inventory.entries, categories, on_chunk("Checking components")
+        )
+    if plan is None:
+        return None
+    changes, examined = plan
+
+    applied = visibility.apply_changes(changes, on_chunk("Hiding objects"))
+    # Record the prior state of what was written so Restore Visibility can
+    # replay exactly these flags, including after a cancel.
+    if applied:
+        visibility.record_snapshot(design, changes[:applied])
+        # Counts are per component; occurrence-scoped proxies don't move them.
+        if not scope:
+            visibility.note_changes(design, changes[:applied])
+    if applied < len(changes):
+        return applied, len(changes), examined, 0, True
+
+    override_changes = visibility.plan_override_changes(overrides)
+    override_applied = visibility.apply_changes(override_changes)
+    if override_applied:
+        visibility.record_snapshot(design, override_changes)
+        visibility.note_changes(design, override_changes)
+
+    return applied, len(changes), examined, override_applied, False
+
+
+def application_command_terminated(args: adsk.core.ApplicationCommandEventArgs) -> None:
+    if args.commandId in INDEX_SAFE_COMMANDS:
+        return
+    if args.terminationReason == adsk.core.CommandTerminationReason.CancelledTerminationReason:
+        return
+    visibility.invalidate_inventory(app.activeDocument)
+
+
+def application_document_closed(args: adsk.core.DocumentEventArgs) -> None:
+    # The closed document can no longer be resolved, so drop every entry.
+    visibility.invalidate_inventory()
 
 
 def command_destroy(args: adsk.core.CommandEventArgs) -> None:
@@ -0,0 +1,508 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Visibility planning, snapshot and preset helpers shared by Hide Objects
+and Restore Visibility.
+
+Hide Objects records the prior state of every flag it changes in a design
+attribute so Restore Visibility can replay exactly those flags later. The
+snapshot is a compact JSON list of [entityToken, property code, prior]
+triples; it travels with the design and survives add-in restarts.
+
+Planning runs against a per-document inventory of the hideable objects in
+each component. The inventory is built by one walk of design.allComponents,
+which also counts the visible objects per category for the dialog labels.
+It is reused until a command that may have changed the design terminates,
+and its counts are adjusted in place after our own writes, so opening the
+dialog or switching presets does not re-walk every collection.
+"""
+
+import json
+from bisect import bisect_left
+from typing import Callable
+
+import adsk.core
+import adsk.fusion
+
+ATTRIBUTE_GROUP = "PTPM-hideobjects"
+SNAPSHOT_ATTRIBUTE = "visibilitySnapshot"
+SNAPSHOT_VERSION = 1
+
+# Named presets live in their own group so they can be listed with itemsByGroup.
+PRESET_GROUP = "PTPM-hideobjects-presets"
+PRESET_VERSION = 1
+
+# Per-object categories and the Component collection each one indexes.
+# Origin, Joints and Canvas are folder-level flags on the component itself.
+OBJECT_COLLECTIONS = {
+    "hide_construction_points": "constructionPoints",
+    "hide_construction_axes": "constructionAxes",
+    "hide_construction_planes": "constructionPlanes",
+    "hide_joint_origins": "jointOrigins",
+    "hide_sketches": "sketches",
+}
+
+# Folder-level categories and the Component flag each one controls.
+FOLDER_PROPERTIES = {
+    "hide_origin": "isOriginFolderLightBulbOn",
+    "hide_joints": "isJointsFolderLightBulbOn",
+    "hide_canvas": "isCanvasFolderLightBulbOn",
+}
+_FOLDER_CATEGORIES = {prop: category for category, prop in FOLDER_PROPERTIES.items()}
+
+# Origin geometry of a component, hidden through proxies in occurrence mode
+# where the component-level origin folder flag cannot be scoped.
+ORIGIN_OBJECTS = (
+    "originConstructionPoint",
+    "xConstructionAxis",
+    "yConstructionAxis",
+    "zConstructionAxis",
+    "xYConstructionPlane",
+    "xZConstructionPlane",
+    "yZConstructionPlane",
+)
+
+# Separator Fusion uses between occurrence names in fullPathName.
+OCCURRENCE_PATH_SEPARATOR = "+"
+
+# objectType of each per-object category, used to keep counts current.
+_OBJECT_TYPE_CATEGORIES = {
+    "adsk::fusion::ConstructionPoint": "hide_construction_points",
+    "adsk::fusion::ConstructionAxis": "hide_construction_axes",
+    "adsk::fusion::ConstructionPlane": "hide_construction_planes",
+    "adsk::fusion::JointOrigin": "hide_joint_origins",
+    "adsk::fusion::Sketch": "hide_sketches",
+}
+
+# Short codes keep the snapshot small on large assemblies.
+PROPERTY_CODES = {
+    "isLightBulbOn": "L",
+    "isOriginFolderLightBulbOn": "O",
+    "isJointsFolderLightBulbOn": "J",
+    "isSketchFolderLightBulbOn": "S",
+    "isCanvasFolderLightBulbOn": "C",
+}
+_PROPERTY_NAMES = {code: name for name, code in PROPERTY_CODES.items()}
+
+# Work is split into chunks so callers can pump events and show progress.
+# A chunk callback receives (done, total) and returns False to cancel.
+CHUNK_SIZE = 100
+ChunkCallback = Callable[[int, int], bool]
+
+Change = tuple[adsk.core.Base, str, bool]
+IndexEntry = tuple[adsk.fusion.Component, dict[str, list[adsk.core.Base]]]
+
+
+
+class Inventory:
+    """Hideable objects of one document grouped by component, plus the number
+    currently visible in each category.
+
+    The occurrence-path index is built lazily on the first occurrence-scoped
+    run: occurrence_paths is a sorted list of (fullPathName, occurrence,
+    component id) so a subtree is one contiguous bisect range.
+    """
+
+    def __init__(
+        self,
+        entries: list[IndexEntry],
+        visible_counts: dict[str, int],
+        by_component_id: dict[str, IndexEntry],
+    ):
+        self.entries = entries
+        self.visible_counts = visible_counts
+        self.by_component_id = by_component_id
+        self.occurrence_paths: list[tuple[str, adsk.fusion.Occurrence, str]] | None = None
+
+
+# {document creationId: Inventory}
+_inventory_cache: dict[str, Inventory] = {}
+
+
+# ── Inventory ─────────────────────────────────────────────────────────────────
+
+
+def _document_key(design: adsk.fusion.Design) -> str:
+    return design.parentDocument.creationId
+
+
+def _report(on_chunk: ChunkCallback | None, done: int, total: int) -> bool:
+    return on_chunk is None or on_chunk(done, total)
+
+
+def build_inventory(
+    design: adsk.fusion.Design, on_chunk: ChunkCallback | None = None
+) -> Inventory | None:
+    """Walk every component once, collecting its hideable objects by category
+    and counting the visible ones.
+
+    Returns None when *on_chunk* cancels the walk.
+    """
+    components = list(design.allComponents)
+    total = len(components)
+    entries: list[IndexEntry] = []
+    by_component_id: dict[str, IndexEntry] = {}
+    counts = {category: 0 for category in (*FOLDER_PROPERTIES, *OBJECT_COLLECTIONS)}
+    for i, component in enumerate(components, start=1):
+        for category, prop in FOLDER_PROPERTIES.items():
+            if getattr(component, prop):
+                counts[category] += 1
+        objects = {}
+        for category, collection in OBJECT_COLLECTIONS.items():
+            objects[category] = list(getattr(component, collection))
+            counts[category] += sum(1 for obj in objects[category] if obj.isLightBulbOn)
+        entry = (component, objects)
+        entries.append(entry)
+        by_component_id[component.id] = entry
+        if i % CHUNK_SIZE == 0 and not _report(on_chunk, i, total):
+            return None
+    _report(on_chunk, total, total)
+    return Inventory(entries, counts, by_component_id)
+
+
+def get_inventory(
+    design: adsk.fusion.Design,
+    on_chunk: ChunkCallback | None = None,
+    *,
+    build: bool = True,
+) -> Inventory | None:
+    """Return the cached inventory for *design*, building it on first use.
+
+    Returns None when the build is cancelled (a partial inventory is never
+    cached) or, with build=False, when nothing is cached yet.
+    """
+    key = _document_key(design)
+    inventory = _inventory_cache.get(key)
+    if inventory is None and build:
+        inventory = build_inventory(design, on_chunk)
+        if inventory is not None:
+            _inventory_cache[key] = inventory
+    return inventory
+
+
+def invalidate_inventory(document: adsk.core.Document | None = None) -> None:
+    """Drop the cached inventory for *document*, or for every document when None."""
+    if document is None:
+        _inventory_cache.clear()
+        return
+    try:
+        _inventory_cache.pop(document.creationId, None)
+    except Exception:
+        _inventory_cache.clear()
+
+
+def note_changes(design: adsk.fusion.Design, changes: list[Change]) -> None:
+    """Adjust the cached visible counts for changes we have just written.
+
+    The counts are per component, so writes through assembly-context proxies
+    (an occurrence-scoped hide, or restoring one) are skipped.
+    """
+    inventory = get_inventory(design, build=False)
+    if inventory is None:
+        return
+    counts = inventory.visible_counts
+    for obj, attr, value in changes:
+        if getattr(obj, "assemblyContext", None) is not None:
+            continue
+        if attr == "isLightBulbOn":
+            category = _OBJECT_TYPE_CATEGORIES.get(obj.objectType)
+        else:
+            category = _FOLDER_CATEGORIES.get(attr)
+        if category is not None:
+            counts[category] += 1 if value else -1
+
+
+# ── Planning ──────────────────────────────────────────────────────────────────
+
+
+def plan_visibility_changes(
+    entries: list[IndexEntry],
+    categories: dict[str, bool],
+    on_chunk: ChunkCallback | None = None,
+) -> tuple[list[Change], int] | None:
+    """Return (changes, examined) for the selected categories, or None when
+    cancelled.
+
+    *changes* lists (object, property name, new value) only for objects whose
+    current visibility differs from the target; *examined* is the number of
+    visibility flags that were read.
+    """
+    changes: list[Change] = []
+    examined = 0
+
+    def want(obj, attr: str, value: bool) -> None:
+        nonlocal examined
+        examined += 1
+        if getattr(obj, attr) != value:
+            changes.append((obj, attr, value))
+
+    total = len(entries)
+    for i, (component, objects) in enumerate(entries, start=1):
+        if categories["hide_origin"]:
+            want(component, "isOriginFolderLightBulbOn", False)
+
+        if categories["hide_joints"]:
+            want(component, "isJointsFolderLightBulbOn", False)
+
+        if categories["hide_canvas"]:
+            want(component, "isCanvasFolderLightBulbOn", False)
+
+        if categories["hide_sketches"]:
+            want(component, "isSketchFolderLightBulbOn", True)
+
+        for category in OBJECT_COLLECTIONS:
+            if categories[category]:
+                for obj in objects[category]:
+                    want(obj, "isLightBulbOn", False)
+
+        if i % CHUNK_SIZE == 0 and not _report(on_chunk, i, total):
+            return None
+
+    _report(on_chunk, total, total)
+    return changes, examined
+
+
+def _occurrence_paths(
+    inventory: Inventory, design: adsk.fusion.Design
+) -> list[tuple[str, adsk.fusion.Occurrence, str]]:
+    """Return the inventory's occurrence-path index, building it on first use."""
+    if inventory.occurrence_paths is None:
+        inventory.occurrence_paths = sorted(
+            (
+                (occ.fullPathName, occ, occ.component.id)
+                for occ in design.rootComponent.allOccurrences
+            ),
+            key=lambda item: item[0],
+        )
+    return inventory.occurrence_paths
+
+
+def occurrence_subtree(
+    inventory: Inventory,
+    design: adsk.fusion.Design,
+    occurrences: list[adsk.fusion.Occurrence],
+) -> list[tuple[adsk.fusion.Occurrence, str]]:
+    """Return (occurrence, component id) for every occurrence at or below the
+    given ones, without duplicates when selections are nested."""
+    paths = _occurrence_paths(inventory, design)
+    keys = [item[0] for item in paths]
+    result: dict[str, tuple[adsk.fusion.Occurrence, str]] = {}
+    for occurrence in occurrences:
+        root_path = occurrence.fullPathName
+        prefix = root_path + OCCURRENCE_PATH_SEPARATOR
+        i = bisect_left(keys, root_path)
+        if i < len(paths) and keys[i] == root_path:
+            result[root_path] = (paths[i][1], paths[i][2])
+        # Descendants share the "<root>+" prefix and sort contiguously.
+        i = bisect_left(keys, prefix)
+        while i < len(paths) and keys[i].startswith(prefix):
+            path, occ, component_id = paths[i]
+            result[path] = (occ, component_id)
+            i += 1
+    return list(result.values())
+
+
+def plan_occurrence_changes(
+    inventory: Inventory,
+    design: adsk.fusion.Design,
+    occurrences: list[adsk.fusion.Occurrence],
+    categories: dict[str, bool],
+    on_chunk: ChunkCallback | None = None,
+) -> tuple[list[Change], int] | None:
+    """Plan hides scoped to the subtrees of *occurrences*.
+
+    Objects are addressed through assembly-context proxies so only the
+    selected occurrences are affected, even when their components are
+    reused elsewhere. Origin geometry is hidden object by object; the Joints
+    and Canvas folders are component-wide and are not scoped.
+    Returns (changes, examined), or None when cancelled.
+    """
+    changes: list[Change] = []
+    examined = 0
+
+    def want(obj, value: bool) -> None:
+        # createForAssemblyContext returns None when no proxy can be made.
+        nonlocal examined
+        if obj is None:
+            return
+        examined += 1
+        if obj.isLightBulbOn != value:
+            changes.append((obj, "isLightBulbOn", value))
+
+    subtree = occurrence_subtree(inventory, design, occurrences)
+    total = len(subtree)
+    for i, (occ, component_id) in enumerate(subtree, start=1):
+        entry = inventory.by_component_id.get(component_id)
+        if entry is not None:
+            component, objects = entry
+            if categories["hide_origin"]:
+                for name in ORIGIN_OBJECTS:
+                    want(getattr(component, name).createForAssemblyContext(occ), False)
+            for category in OBJECT_COLLECTIONS:
+                if categories[category]:
+                    for obj in objects[category]:
+                        want(obj.createForAssemblyContext(occ), False)
+
+        if i % CHUNK_SIZE == 0 and not _report(on_chunk, i, total):
+            return None
+
+    _report(on_chunk, total, total)
+    return changes, examined
+
+
+def plan_override_changes(overrides: list[tuple[adsk.core.Base, bool]]) -> list[Change]:
+    """Return the changes needed to force each (object, visible) override.
+
+    Overrides are planned after the category changes have been written so
+    an object that is both in a hidden category and forced visible ends up
+    visible.
+    """
+    return [
+        (obj, "isLightBulbOn", visible)
+        for obj, visible in overrides
+        if obj.isLightBulbOn != visible
+    ]
+
+
+def apply_changes(changes: list[Change], on_chunk: ChunkCallback | None = None) -> int:
+    """Write the planned changes in order and return how many were written.
+
+    When *on_chunk* cancels, the changes written so far stay applied.
+    """
+    total = len(changes)
+    for i, (obj, attr, value) in enumerate(changes, start=1):
+        setattr(obj, attr, value)
+        if i % CHUNK_SIZE == 0 and i < total and not _report(on_chunk, i, total):
+            return i
+    _report(on_chunk, total, total)
+    return total
+
+
+# ── Snapshot ──────────────────────────────────────────────────────────────────
+
+
+def read_snapshot(design: adsk.fusion.Design) -> dict[tuple[str, str], bool]:
+    """Return {(entityToken, property code): prior value} from the design, or {}."""
+    attr = design.attributes.itemByName(ATTRIBUTE_GROUP, SNAPSHOT_ATTRIBUTE)
+    if attr is None:
+        return {}
+    try:
+        payload = json.loads(attr.value)
+    except ValueError:
+        return {}
+    if payload.get("v") != SNAPSHOT_VERSION:
+        return {}
+    return {
+        (token, code): bool(prior) for token, code, prior in payload.get("entries", [])
+    }
+
+
+def record_snapshot(design: adsk.fusion.Design, changes: list[Change]) -> int:
+    """Merge the prior state of *changes* into the design snapshot.
+
+    Entries already in the snapshot keep their original prior value, so
+    running Hide Objects repeatedly still restores the first working view.
+    Returns the number of entries in the stored snapshot.
+    """
+    snapshot = read_snapshot(design)
+    for obj, attr, value in changes:
+        key = (obj.entityToken, PROPERTY_CODES[attr])
+        # Only differing flags are planned, so the prior is the opposite.
+        snapshot.setdefault(key, not value)
+
+    payload = {
+        "v": SNAPSHOT_VERSION,
+        "entries": [
+            [token, code, int(prior)] for (token, code), prior in snapshot.items()
+        ],
+    }
+    design.attributes.add(
+        ATTRIBUTE_GROUP, SNAPSHOT_ATTRIBUTE, json.dumps(payload, separators=(",", ":"))
+    )
+    return len(snapshot)
+
+
+def clear_snapshot(design: adsk.fusion.Design) -> None:
+    """Delete the stored snapshot, if any."""
+    attr = design.attributes.itemByName(ATTRIBUTE_GROUP, SNAPSHOT_ATTRIBUTE)
+    if attr is not None:
+        attr.deleteMe()
+
+
+def restore_snapshot(
+    design: adsk.fusion.Design, snapshot: dict[tuple[str, str], bool]
+) -> tuple[int, int, int]:
+    """Replay *snapshot* onto the design with the same read-diff-write rule.
+
+    Returns (restored, unchanged, missing): flags written, flags that already
+    matched, and entries whose object no longer exists.
+    """
+    by_token: dict[str, list[tuple[str, bool]]] = {}
+    for (token, code), prior in snapshot.items():
+        by_token.setdefault(token, []).append((code, prior))
+
+    restored = unchanged = missing = 0
+    written: list[Change] = []
+    for token, entries in by_token.items():
+        found = design.findEntityByToken(token)
+        if not found:
+            missing += len(entries)
+            continue
+        entity = found[0]
+        for code, prior in entries:
+            attr = _PROPERTY_NAMES.get(code)
+            if attr is None:
+                missing += 1
+                continue
+            if getattr(entity, attr) != prior:
+                setattr(entity, attr, prior)
+                written.append((entity, attr, prior))
+                restored += 1
+            else:
+                unchanged += 1
+    note_changes(design, written)
+    return restored, unchanged, missing
+
+
+# ── Presets ───────────────────────────────────────────────────────────────────
+
+
+def list_presets(design: adsk.fusion.Design) -> list[str]:
+    """Return the names of the presets saved in *design*, sorted."""
+    return sorted(attr.name for attr in design.attributes.itemsByGroup(PRESET_GROUP))
+
+
+def read_preset(design: adsk.fusion.Design, name: str) -> dict | None:
+    """Return {"categories": {...}, "overrides": [[token, visible], ...]} or None."""
+    attr = design.attributes.itemByName(PRESET_GROUP, name)
+    if attr is None:
+        return None
+    try:
+        payload = json.loads(attr.value)
+    except ValueError:
+        return None
+    if payload.get("v") != PRESET_VERSION:
+        return None
+    return payload
+
+
+def write_preset(
+    design: adsk.fusion.Design,
+    name: str,
+    categories: dict[str, bool],
+    overrides: list[tuple[str, bool]],
+) -> None:
+    """Save (or overwrite) preset *name* with category choices and
+    [entityToken, visible] overrides."""
+    payload = {
+        "v": PRESET_VERSION,
+        "categories": categories,
+        "overrides": [[token, bool(visible)] for token, visible in overrides],
+    }
+    design.attributes.add(PRESET_GROUP, name, json.dumps(payload, separators=(",", ":")))
+
+
+def delete_preset(design: adsk.fusion.Design, name: str) -> None:
+    attr = design.attributes.itemByName(PRESET_GROUP, name)
+    if attr is not None:
+        attr.deleteMe()
@@ -3,11 +3,14 @@
 
 import adsk.core
 import adsk.fusion
+import fnmatch
 import os
+from collections import deque
 from typing import cast
 
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from . import mirror_cache
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -24,8 +27,32 @@ DERIVE_CMD_ID = "FusionInsertDeriveCommand"
 
 ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
 
+MIRROR_SUFFIX = "-mirror"
+MODE_ACTIVE = "Active design"
+MODE_FOLDER = "Designs in folder"
+MODE_REFRESH = "Refresh existing mirror"
+
+# Verification tolerances: volume and area are compared relatively, bounding
+# box extents (cm) absolutely.
+VERIFY_RELATIVE_TOLERANCE = 1e-6
+VERIFY_LENGTH_TOLERANCE_CM = 1e-4
+
+# Batch mode keeps this many mirror uploads in flight while the next
+# document is derived; the oldest is awaited once the window is full.
+MAX_IN_FLIGHT_UPLOADS = 3
+
 local_handlers = []
 
+# Phase timings for the current run, recorded when config.PERF_TRACE is on;
+# appended to <log dir>/PTPM-createmirrordesign_metrics.jsonl and
+# summarised in the final message. Phases take from milliseconds to
+# minutes, so the histogram buckets run up to ten minutes.
+_PHASE_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 180000, 600000)
+_phases = futil.LatencyRecorder(CMD_ID, buckets_ms=_PHASE_BUCKETS_MS)
+
+# {checkbox input id: DataFile} for the batch candidates shown in the dialog.
+_batch_candidates: dict[str, adsk.core.DataFile] = {}
+
 
 def start() -> None:
     try:
@@ -74,14 +101,79 @@ def stop() -> None:
 def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
     futil.log(f"{CMD_NAME} Command Created Event")
 
+    inputs = args.command.commandInputs
+    mode = inputs.addDropDownCommandInput(
+        "mode", "Mirror", adsk.core.DropDownStyles.TextListDropDownStyle
+    )
+    mode.listItems.add(MODE_ACTIVE, True, "")
+    mode.listItems.add(MODE_FOLDER, False, "")
+    mode.listItems.add(MODE_REFRESH, False, "")
+
+    batch_group = inputs.addGroupCommandInput("batch_files", "Designs to mirror")
+    batch_group.isVisible = False
+
+    verify_input = inputs.addBoolValueInput("verify", "Verify mirror", True, "", False)
+    verify_input.tooltip = (
+        "Compare each mirrored body's volume, area and bounding box with its "
+        "source body before saving"
+    )
+
+    filter_group = inputs.addGroupCommandInput("derive_filters", "Derive filters")
+    filter_group.isExpanded = False
+    filter_inputs = filter_group.children
+    filter_inputs.addBoolValueInput(
+        "visible_only", "Visible bodies only", True, "", False
+    )
+    subtree_input = filter_inputs.addSelectionInput(
+        "subtree",
+        "Only under",
+        "Derive only the bodies of this component and its children (active design only)",
+    )
+    subtree_input.addSelectionFilter("Occurrences")
+    subtree_input.setSelectionLimits(0, 1)
+    filter_inputs.addStringValueInput("name_pattern", "Body name", "")
+    filter_inputs.itemById("name_pattern").tooltip = (
+        "Wildcard patterns such as Body* or *_final, separated by commas. "
+        "Leave empty to derive every body."
+    )
+
     futil.add_handler(
         args.command.execute, command_execute, local_handlers=local_handlers
     )
+    futil.add_handler(
+        args.command.inputChanged, command_input_changed, local_handlers=local_handlers
+    )
     futil.add_handler(
         args.command.destroy, command_destroy, local_handlers=local_handlers
     )
 
 
+def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
+    if args.input.id != "mode":
+        return
+
+    inputs = args.inputs
+    batch_group = adsk.core.GroupCommandInput.cast(inputs.itemById("batch_files"))
+    mode = inputs.itemById("mode").selectedItem.name
+    is_batch = mode == MODE_FOLDER
+    batch_group.isVisible = is_batch
+    # A refresh keeps the bodies the mirror was created with.
+    inputs.itemById("derive_filters").isVisible = mode != MODE_REFRESH
+    inputs.itemById("verify").isVisible = mode != MODE_REFRESH
+
+    # Enumerate the folder once, the first time batch mode is chosen.
+    if is_batch and not _batch_candidates:
+        folder = _batch_source_folder()
+        if folder is None:
+            return
+        for i, data_file in enumerate(_list_batch_candidates(folder)):
+            input_id = f"batch_file_{i}"
+            batch_group.children.addBoolValueInput(
+                input_id, data_file.name, True, "", True
+            )
+            _batch_candidates[input_id] = data_file
+
+
 def _validate_source_design() -> tuple[adsk.fusion.Design, adsk.core.DataFile]:
     product = app.activeProduct
     design = adsk.fusion.Design.cast(product)
@@ -105,15 +197,69 @@ def _validate_source_design() -> tuple[adsk.fusion.Design, adsk.core.DataFile]:
     return design, source_data_file
 
 
+class _ComponentIndex:
+    """Unique components of a design and their bodies, built in one pass.
+
+    The root component comes first, followed by each component the first
+    time one of its occurrences is reached in allOccurrences. Validation,
+    scaling and reporting all read from this index, so a deep derived
+    assembly is walked only once.
+    """
+
+    def __init__(self, root_comp: adsk.fusion.Component):
+        # [(component, bodies)] for components that own at least one body.
+        self.entries: list[tuple[adsk.fusion.Component, adsk.core.ObjectCollection]] = []
+        self.component_count = 0
+        self.body_count = 0
+
+        seen_tokens: set[str] = set()
+        components = [root_comp] + [occ.component for occ in root_comp.allOccurrences]
+        for component in components:
+            token = component.entityToken
+            if token in seen_tokens:
+                continue
+            seen_tokens.add(token)
+            self.component_count += 1
+
+            bodies = _collect_component_bodies(component)
+            if bodies.count:
+                self.entries.append((component, bodies))
+                self.body_count += bodies.count
+
+    def describe(self) -> str:
+        return f"{self.body_count} bodies in {len(self.entries)} components"
+
+
+def _read_derive_filter(inputs: adsk.core.CommandInputs) -> dict:
+    """Return the derive filter keyword arguments for _collect_source_bodies."""
+    subtree_input = adsk.core.SelectionCommandInput.cast(inputs.itemById("subtree"))
+    subtree = None
+    if subtree_input.selectionCount:
+        subtree = adsk.fusion.Occurrence.cast(subtree_input.selection(0).entity)
+    patterns = inputs.itemById("name_pattern").value
+    return {
+        "visible_only": inputs.itemById("visible_only").value,
+        "name_patterns": tuple(
+            p.strip().lower() for p in patterns.split(",") if p.strip()
+        ),
+        "subtree": subtree,
+    }
+
+
 def _derive_into_new_document(
     source_design: adsk.fusion.Design,
-) -> tuple[adsk.core.Document, adsk.fusion.Design]:
-    new_document = app.documents.add(
-        cast(
-            adsk.core.DocumentTypes,
-            adsk.core.DocumentTypes.FusionDesignDocumentType,
+    source_bodies: list[adsk.core.Base],
+    created: list | None = None,
+) -> tuple[adsk.core.Document, _ComponentIndex]:
+    with _phases.frame("create document"):
+        new_document = app.documents.add(
+            cast(
+                adsk.core.DocumentTypes,
+                adsk.core.DocumentTypes.FusionDesignDocumentType,
+            )
         )
-    )
+    if created is not None:
+        created.append(new_document)
     target_design = adsk.fusion.Design.cast(app.activeProduct)
     if not target_design:
         raise RuntimeError("Failed to create target design document.")
@@ -122,38 +268,57 @@ def _derive_into_new_document(
     derive_features = root_comp.features.deriveFeatures
 
     derive_input = derive_features.createInput(source_design)
-    source_bodies = _collect_source_bodies(source_design)
-    if len(source_bodies) == 0:
-        raise RuntimeError("No source bodies found to derive.")
-
     derive_input.sourceEntities = source_bodies
 
-    derive_features.add(derive_input)
+    with _phases.frame("derive"):
+        derive_features.add(derive_input)
 
-    if _count_bodies_in_root(root_comp) == 0:
+    with _phases.frame("index components"):
+        index = _ComponentIndex(root_comp)
+    if index.body_count == 0:
         raise RuntimeError("No bodies were derived into the new document.")
 
-    return new_document, target_design
+    return new_document, index
 
 
-def _collect_source_bodies(source_design: adsk.fusion.Design) -> list[adsk.core.Base]:
-    source_entities: list[adsk.core.Base] = []
+def _collect_source_bodies(
+    source_design: adsk.fusion.Design,
+    *,
+    visible_only: bool = False,
+    name_patterns: tuple[str, ...] = (),
+    subtree: adsk.fusion.Occurrence | None = None,
+) -> list[adsk.core.Base]:
+    """Return the source bodies to derive, after applying the dialog filters.
+
+    *subtree* limits the search to that occurrence's component and the
+    components below it; *name_patterns* are lower-cased fnmatch patterns.
+    """
+    if subtree is not None:
+        root = subtree.component
+        components = [root] + [occ.component for occ in root.allOccurrences]
+    else:
+        components = list(source_design.allComponents)
 
-    all_components = source_design.allComponents
-    for component in all_components:
+    source_entities: list[adsk.core.Base] = []
+    seen_components: set[str] = set()
+    for component in components:
+        token = component.entityToken
+        if token in seen_components:
+            continue
+        seen_components.add(token)
         for body in component.bRepBodies:
+            if visible_only and not body.isVisible:
+                continue
+            if name_patterns and not any(
+                fnmatch.fnmatchcase(body.name.lower(), pattern)
+                for pattern in name_patterns
+            ):
+                continue
             source_entities.append(body)
 
     return source_entities
 
 
-def _count_bodies_in_root(root_comp: adsk.fusion.Component) -> int:
-    body_count = root_comp.bRepBodies.count
-    for occ in root_comp.allOccurrences:
-        body_count += occ.bRepBodies.count
-    return body_count
-
-
 def _add_scale_feature(
     scale_features: adsk.fusion.ScaleFeatures,
     entities: adsk.core.ObjectCollection,
@@ -189,92 +354,540 @@ def _collect_component_bodies(
     return entities
 
 
-def _apply_post_derive_scale(target_design: adsk.fusion.Design) -> None:
-    root_comp = target_design.rootComponent
+def _apply_post_derive_scale(index: _ComponentIndex) -> None:
     scale_value = adsk.core.ValueInput.createByReal(1.0)
 
     did_scale = False
-    scaled_component_tokens: set[str] = set()
+    for component, body_entities in index.entries:
+        with _phases.frame("scale component"):
+            scale_feature = _add_scale_feature(
+                component.features.scaleFeatures,
+                body_entities,
+                component.originConstructionPoint,
+                scale_value,
+            )
+            _set_scale_parameter_to_negative_one(scale_feature)
+        did_scale = True
 
-    components_to_scale: list[adsk.fusion.Component] = [root_comp]
-    for occ in root_comp.allOccurrences:
-        comp = occ.component
-        token = comp.entityToken
-        if token in scaled_component_tokens:
-            continue
-        scaled_component_tokens.add(token)
-        components_to_scale.append(comp)
+    if not did_scale:
+        raise RuntimeError("No valid derived bodies found to scale.")
 
-    for component in components_to_scale:
-        body_entities = _collect_component_bodies(component)
+
+def _scale_unscaled_bodies(index: _ComponentIndex) -> int:
+    """Scale bodies that no existing scale feature covers; return how many.
+
+    After a refresh, bodies that were already mirrored keep their scale
+    feature. Only bodies the updated derive brought in need a new one.
+    """
+    scale_value = adsk.core.ValueInput.createByReal(1.0)
+    added = 0
+    for component, bodies in index.entries:
+        scaled_tokens: set[str] = set()
+        for scale_feature in component.features.scaleFeatures:
+            for entity in scale_feature.inputEntities:
+                scaled_tokens.add(entity.entityToken)
+
+        body_entities = adsk.core.ObjectCollection.create()
+        for body in bodies:
+            if body.entityToken not in scaled_tokens:
+                body_entities.add(body)
         if body_entities.count == 0:
             continue
 
-        scale_feature = _add_scale_feature(
-            component.features.scaleFeatures,
-            body_entities,
-            component.originConstructionPoint,
-            scale_value,
+        with _phases.frame("scale component"):
+            scale_feature = _add_scale_feature(
+                component.features.scaleFeatures,
+                body_entities,
+                component.originConstructionPoint,
+                scale_value,
+            )
+            _set_scale_parameter_to_negative_one(scale_feature)
+        added += body_entities.count
+    return added
+
+
+def _find_mirror_file(source_data_file: adsk.core.DataFile) -> adsk.core.DataFile | None:
+    """Return the mirror of *source_data_file* from the mirror map, or by name."""
+    mirror_id = mirror_cache.lookup_mirror(source_data_file, CMD_NAME)
+    if mirror_id:
+        try:
+            mirror_file = app.data.findFileById(mirror_id)
+            if mirror_file:
+                return mirror_file
+        except Exception:
+            futil.log(f"{CMD_NAME}: cached mirror {mirror_id} not found — searching folder")
+
+    # Mirrors created before the map existed are found by name and recorded.
+    mirror_name = f"{source_data_file.name}{MIRROR_SUFFIX}"
+    for data_file in source_data_file.parentFolder.dataFiles.asArray():
+        if data_file.name == mirror_name:
+            mirror_cache.record_mirror(source_data_file, data_file, CMD_NAME)
+            return data_file
+    return None
+
+
+def _update_source_reference(
+    mirror_document: adsk.core.Document, source_data_file: adsk.core.DataFile
+) -> bool:
+    """Move the mirror's reference to the source onto its latest version.
+
+    Returns False when the mirror already references the latest version.
+    """
+    updated = False
+    for reference in mirror_document.documentReferences:
+        if reference.dataFile.id != source_data_file.id:
+            continue
+        if reference.isOutOfDate:
+            reference.getLatestVersion()
+            updated = True
+    return updated
+
+
+def _body_signature(body: adsk.fusion.BRepBody) -> tuple[float, float, tuple[float, ...]]:
+    """Return (volume, area, sorted extents) from the body's cached properties."""
+    box = body.boundingBox
+    extents = sorted(
+        (
+            box.maxPoint.x - box.minPoint.x,
+            box.maxPoint.y - box.minPoint.y,
+            box.maxPoint.z - box.minPoint.z,
         )
-        _set_scale_parameter_to_negative_one(scale_feature)
-        did_scale = True
+    )
+    return body.volume, body.area, tuple(extents)
 
-    if not did_scale:
-        raise RuntimeError("No valid derived bodies found to scale.")
+
+def _precise_signature(body: adsk.fusion.BRepBody) -> tuple[float, float, tuple[float, ...]]:
+    """Return (volume, area, sorted extents) from high-accuracy queries.
+
+    BRepBody.boundingBox is not guaranteed tight, so extents come from a
+    world-aligned oriented bounding box measured on the actual geometry.
+    """
+    props = body.getPhysicalProperties(
+        adsk.fusion.CalculationAccuracy.VeryHighCalculationAccuracy
+    )
+    box = app.measureManager.getOrientedBoundingBox(
+        body,
+        adsk.core.Vector3D.create(1, 0, 0),
+        adsk.core.Vector3D.create(0, 1, 0),
+    )
+    extents = sorted((box.length, box.width, box.height))
+    return props.volume, props.area, tuple(extents)
+
+
+def _signatures_match(a: tuple, b: tuple) -> bool:
+    volume_a, area_a, extents_a = a
+    volume_b, area_b, extents_b = b
+    return (
+        _relatively_close(volume_a, volume_b)
+        and _relatively_close(area_a, area_b)
+        and all(
+            abs(x - y) <= VERIFY_LENGTH_TOLERANCE_CM
+            for x, y in zip(extents_a, extents_b)
+        )
+    )
+
+
+def _relatively_close(a: float, b: float) -> bool:
+    return abs(a - b) <= VERIFY_RELATIVE_TOLERANCE * max(abs(a), abs(b), 1e-12)
+
+
+def _verify_mirror(
+    source_bodies: list[adsk.core.Base], index: _ComponentIndex
+) -> list[str]:
+    """Compare source and mirrored bodies; return a description per mismatch.
+
+    A -1 scale preserves volume, area and bounding-box extents, so bodies
+    are paired by sorting both sides on their cached signature. Only pairs
+    that disagree are re-measured with the precise queries and re-matched
+    against the other unpaired bodies; the common case costs one property
+    read per body.
+    """
+    mirror_bodies = [body for _, bodies in index.entries for body in bodies]
+    if len(mirror_bodies) != len(source_bodies):
+        return [
+            f"Body count differs: {len(source_bodies)} in the source, "
+            f"{len(mirror_bodies)} in the mirror."
+        ]
+
+    source = sorted(((_body_signature(b), b) for b in source_bodies), key=lambda e: e[0])
+    mirror = sorted(((_body_signature(b), b) for b in mirror_bodies), key=lambda e: e[0])
+
+    unmatched_source = []
+    unmatched_mirror = []
+    for (source_sig, source_body), (mirror_sig, mirror_body) in zip(source, mirror):
+        if not _signatures_match(source_sig, mirror_sig):
+            unmatched_source.append(source_body)
+            unmatched_mirror.append(mirror_body)
+    if not unmatched_source:
+        return []
+
+    with _phases.frame("verify precise"):
+        remaining = [_precise_signature(body) for body in unmatched_mirror]
+        mismatches = []
+        for source_body in unmatched_source:
+            source_sig = _precise_signature(source_body)
+            for i, mirror_sig in enumerate(remaining):
+                if _signatures_match(source_sig, mirror_sig):
+                    del remaining[i]
+                    break
+            else:
+                volume, area, _ = source_sig
+                mismatches.append(
+                    f"{source_body.name} (volume {volume:.4f} cm\u00b3, "
+                    f"area {area:.4f} cm\u00b2) has no matching mirrored body."
+                )
+    return mismatches
+
+
+def _batch_source_folder() -> adsk.core.DataFolder | None:
+    """Return the folder of the active document, or the Data Panel folder."""
+    try:
+        active_document = app.activeDocument
+        if active_document and active_document.dataFile:
+            return active_document.dataFile.parentFolder
+        return app.data.activeFolder
+    except Exception:
+        futil.log(f"{CMD_NAME}: could not resolve batch source folder")
+        return None
+
+
+def _list_batch_candidates(folder: adsk.core.DataFolder) -> list[adsk.core.DataFile]:
+    """Return the Fusion designs in *folder* that do not have a mirror yet."""
+    files = list(folder.dataFiles.asArray())
+    names = {data_file.name for data_file in files}
+    return [
+        data_file
+        for data_file in files
+        if data_file.fileExtension == "f3d"
+        and not data_file.name.endswith(MIRROR_SUFFIX)
+        and f"{data_file.name}{MIRROR_SUFFIX}" not in names
+    ]
 
 
 def _save_mirror_document(
     new_document: adsk.core.Document,
     source_data_file: adsk.core.DataFile,
     mirror_name: str,
-) -> None:
+) -> int:
+    """Start the saveAs of *new_document* and return its version before the save.
+
+    saveAs only returns a bool, so the upload is confirmed later by waiting
+    for the data file to pass this version (see _wait_for_mirror_upload).
+    """
     folder = source_data_file.parentFolder
     if not folder:
         raise RuntimeError("Unable to determine destination folder for mirror design.")
 
-    save_ok = new_document.saveAs(mirror_name, folder, "Mirrored derived design", "")
+    data_file = new_document.dataFile
+    pre_save_version = data_file.versionNumber if data_file else 0
+    with _phases.frame("saveAs"):
+        save_ok = new_document.saveAs(
+            mirror_name,
+            folder,
+            "Mirrored derived design (scale features edited to -1)",
+            "",
+        )
     if not save_ok:
         raise RuntimeError(f"Save As failed for {mirror_name}.")
+    return pre_save_version
+
+
+def _wait_for_mirror_upload(
+    document: adsk.core.Document, mirror_name: str, pre_save_version: int
+) -> tuple[bool, str]:
+    """Wait until the mirror's cloud data file has a version above *pre_save_version*."""
+    with _phases.frame("upload"):
+        return futil.wait_for_upload(
+            True,
+            mirror_name,
+            document=document,
+            pre_save_version=pre_save_version,
+            log_fn=futil.log,
+        )
 
 
-def command_execute(args: adsk.core.CommandEventArgs) -> None:
-    try:
-        source_design, source_data_file = _validate_source_design()
+def _mirror_design(
+    source_design: adsk.fusion.Design,
+    source_data_file: adsk.core.DataFile,
+    mirror_name: str,
+    derive_filter: dict,
+    verify: bool,
+    created: list | None = None,
+) -> tuple[adsk.core.Document, int, _ComponentIndex, list[str]]:
+    """Derive, scale, optionally verify and start the single save of one mirror.
+
+    The scale is applied before the document is first saved, so each mirror
+    is one version and one upload. Returns (mirror document, version before
+    the save, component index, verification mismatches); the upload is not awaited so
+    batch mode can overlap it with the next derive. The new document is
+    appended to *created* as soon as it exists, so a caller can close it if
+    a later step raises.
+    """
+    with _phases.frame("collect bodies"):
+        source_bodies = _collect_source_bodies(source_design, **derive_filter)
+    if len(source_bodies) == 0:
+        raise RuntimeError("No source bodies match the derive filters.")
 
-        source_name = app.activeDocument.name
-        mirror_name = f"{source_name}-mirror"
+    new_document, index = _derive_into_new_document(source_design, source_bodies, created)
 
-        new_document, target_design = _derive_into_new_document(source_design)
+    _apply_post_derive_scale(index)
 
-        # Create the mirror design file first using the requested naming pattern.
-        _save_mirror_document(new_document, source_data_file, mirror_name)
+    mismatches: list[str] = []
+    if verify:
+        with _phases.frame("verify"):
+            mismatches = _verify_mirror(source_bodies, index)
 
-        _apply_post_derive_scale(target_design)
+    pre_save_version = _save_mirror_document(new_document, source_data_file, mirror_name)
+    return new_document, pre_save_version, index, mismatches
 
-        # Save the post-derive scale operation as the next version of the same file.
-        new_document.save(
-            "Created scale features at 1 and edited scale parameters to -1"
-        )
 
-        ui.messageBox(
-            f"Created mirrored design: {mirror_name}",
-            CMD_NAME,
-            cast(
-                adsk.core.MessageBoxButtonTypes,
-                adsk.core.MessageBoxButtonTypes.OKButtonType,
-            ),
-            cast(
-                adsk.core.MessageBoxIconTypes,
-                adsk.core.MessageBoxIconTypes.InformationIconType,
-            ),
+def _execute_active(derive_filter: dict, verify: bool) -> None:
+    source_design, source_data_file = _validate_source_design()
+
+    source_name = app.activeDocument.name
+    mirror_name = f"{source_name}{MIRROR_SUFFIX}"
+
+    new_document, pre_save_version, index, mismatches = _mirror_design(
+        source_design, source_data_file, mirror_name, derive_filter, verify
+    )
+    ok, message = _wait_for_mirror_upload(new_document, mirror_name, pre_save_version)
+    if not ok:
+        raise RuntimeError(message)
+    mirror_cache.record_mirror(source_data_file, new_document.dataFile, CMD_NAME)
+
+    lines = [
+        f"Created mirrored design: {mirror_name}",
+        f"Mirrored {index.describe()}.",
+    ]
+    if verify and not mismatches:
+        lines.append("Verified: volumes, areas and bounding boxes match the source.")
+    elif mismatches:
+        lines.append("Verification found differences:")
+        lines += [f"\u2022 {m}" for m in mismatches]
+    lines += _timing_breakdown()
+
+    ui.messageBox(
+        "\n".join(lines),
+        CMD_NAME,
+        cast(
+            adsk.core.MessageBoxButtonTypes,
+            adsk.core.MessageBoxButtonTypes.OKButtonType,
+        ),
+        cast(
+            adsk.core.MessageBoxIconTypes,
+            adsk.core.MessageBoxIconTypes.WarningIconType
+            if mismatches
+            else adsk.core.MessageBoxIconTypes.InformationIconType,
+        ),
+    )
+
+
+def _execute_refresh() -> None:
+    _, source_data_file = _validate_source_design()
+    source_document = app.activeDocument
+
+    mirror_file = _find_mirror_file(source_data_file)
+    if mirror_file is None:
+        raise RuntimeError(
+            f"No mirror found for {source_data_file.name}. "
+            "Create the mirrored design first."
         )
 
+    pre_save_version = mirror_file.versionNumber
+    with _phases.frame("open mirror"):
+        mirror_document = app.documents.open(mirror_file, True)
+    keep_open = False
+    try:
+        with _phases.frame("update reference"):
+            updated = _update_source_reference(mirror_document, source_data_file)
+        if not updated:
+            message = f"{mirror_file.name} is already up to date."
+        else:
+            mirror_design = adsk.fusion.Design.cast(
+                mirror_document.products.itemByProductType("DesignProductType")
+            )
+            with _phases.frame("index components"):
+                index = _ComponentIndex(mirror_design.rootComponent)
+            added = _scale_unscaled_bodies(index)
+            with _phases.frame("save"):
+                save_result = mirror_document.save(
+                    f"Refreshed from {source_data_file.name} "
+                    f"v{source_data_file.versionNumber}"
+                )
+            with _phases.frame("upload"):
+                ok, upload_message = futil.wait_for_upload(
+                    save_result,
+                    mirror_file.name,
+                    document=mirror_document,
+                    pre_save_version=pre_save_version,
+                    log_fn=futil.log,
+                )
+            if not ok:
+                keep_open = True
+                raise RuntimeError(upload_message)
+            message = (
+                f"Refreshed {mirror_file.name} to {source_data_file.name} "
+                f"v{source_data_file.versionNumber}."
+            )
+            if added:
+                message += f"\nScaled {added} new bodies."
+    finally:
+        if not keep_open:
+            mirror_document.close(False)
+        futil.safe_activate(source_document, CMD_NAME)
+
+    ui.messageBox("\n".join([message] + _timing_breakdown()), CMD_NAME)
+
+
+def _is_open(data_file: adsk.core.DataFile) -> bool:
+    """Return True if a document for *data_file* is already open."""
+    for document in app.documents:
+        if getattr(document.dataFile, "id", None) == data_file.id:
+            return True
+    return False
+
+
+def _execute_batch(
+    inputs: adsk.core.CommandInputs, derive_filter: dict, verify: bool
+) -> None:
+    selected = [
+        data_file
+        for input_id, data_file in _batch_candidates.items()
+        if inputs.itemById(input_id).value
+    ]
+    if not selected:
+        raise RuntimeError("Select at least one design to mirror.")
+    # The subtree selection belongs to the active design, not the batch files.
+    derive_filter = dict(derive_filter, subtree=None)
+
+    original_document = app.activeDocument
+    results: list[tuple[str, bool, str]] = []
+    verify_failures: list[str] = []
+    # Mirrors whose upload failed stay open so they can be saved by hand.
+    left_open: list[str] = []
+    in_flight: deque = deque()
+
+    def finish_oldest() -> None:
+        document, mirror_name, pre_save_version, source_data_file = in_flight.popleft()
+        # Only the time spent blocked here is recorded; upload time that
+        # overlapped a later derive is free.
+        ok, message = _wait_for_mirror_upload(document, mirror_name, pre_save_version)
+        results.append((mirror_name, ok, message))
+        if ok:
+            mirror_cache.record_mirror(source_data_file, document.dataFile, CMD_NAME)
+            document.close(False)
+        else:
+            left_open.append(mirror_name)
+
+    progress = ui.createProgressDialog()
+    progress.isCancelButtonShown = True
+    progress.show(CMD_NAME, "Mirroring %v of %m", 0, len(selected), 0)
+    try:
+        for i, source_data_file in enumerate(selected):
+            if progress.wasCancelled:
+                break
+            progress.progressValue = i
+            mirror_name = f"{source_data_file.name}{MIRROR_SUFFIX}"
+            source_document = None
+            # A source the user already had open is left open, edits and all.
+            opened_here = not _is_open(source_data_file)
+            created: list = []
+            try:
+                with _phases.frame("open source"):
+                    source_document = app.documents.open(source_data_file, False)
+                source_design = adsk.fusion.Design.cast(
+                    source_document.products.itemByProductType("DesignProductType")
+                )
+                if not source_design:
+                    raise RuntimeError("not a Fusion design")
+                document, pre_save_version, _, mismatches = _mirror_design(
+                    source_design, source_data_file, mirror_name, derive_filter, verify, created
+                )
+                verify_failures += [f"{mirror_name}: {m}" for m in mismatches]
+                in_flight.append(
+                    (document, mirror_name, pre_save_version, source_data_file)
+                )
+            except Exception as e:
+                futil.handle_error(f"{CMD_NAME}: {mirror_name}")
+                results.append((mirror_name, False, str(e)))
+                # The unsaved mirror of a failed design is discarded.
+                for document in created:
+                    try:
+                        document.close(False)
+                    except Exception:
+                        futil.log(f"{CMD_NAME}: could not close {mirror_name} — ignoring")
+            finally:
+                if opened_here and source_document is not None:
+                    source_document.close(False)
+
+            # Let earlier uploads run while this one derives; only block
+            # once the window is full.
+            while len(in_flight) >= MAX_IN_FLIGHT_UPLOADS:
+                finish_oldest()
+            adsk.doEvents()
+
+        progress.message = "Waiting for uploads to finish"
+        while in_flight:
+            finish_oldest()
+    finally:
+        progress.hide()
+        if original_document is not None:
+            futil.safe_activate(original_document, CMD_NAME)
+
+    succeeded = sum(1 for _, ok, _ in results if ok)
+    lines = [f"Mirrored {succeeded} of {len(selected)} designs."]
+    lines += [f"\u2022 {name}: {message}" for name, ok, message in results if not ok]
+    if progress.wasCancelled:
+        lines.append("Cancelled before all designs were processed.")
+    if verify_failures:
+        lines.append("Verification found differences:")
+        lines += [f"\u2022 {failure}" for failure in verify_failures]
+    if left_open:
+        lines.append("These mirrors did not upload and are still open; save or close them:")
+        lines += [f"\u2022 {name}" for name in left_open]
+    lines += _timing_breakdown()
+    ui.messageBox("\n".join(lines), CMD_NAME)
+
+
+def _timing_breakdown() -> list[str]:
+    """Return message lines summarising the phase totals of this run.
+
+    The list is empty when nothing was recorded (PERF_TRACE is off).
+    """
+    parts = []
+    for label, stats in _phases.summary()["events"].items():
+        part = f"{label} {stats['total_ms'] / 1000.0:.1f} s"
+        if stats["count"] > 1:
+            part += f" ({stats['count']}\u00d7)"
+        parts.append(part)
+    return ["", "Timing: " + ", ".join(parts)] if parts else []
+
+
+def command_execute(args: adsk.core.CommandEventArgs) -> None:
+    _phases.reset()
+    mode = None
+    succeeded = False
+    try:
+        inputs = args.command.commandInputs
+        mode = inputs.itemById("mode").selectedItem.name
+        verify = inputs.itemById("verify").value
+        if mode == MODE_FOLDER:
+            _execute_batch(inputs, _read_derive_filter(inputs), verify)
+        elif mode == MODE_REFRESH:
+            _execute_refresh()
+        else:
+            _execute_active(_read_derive_filter(inputs), verify)
+        succeeded = True
+
     except Exception as e:
         futil.handle_error(CMD_NAME)
         ui.messageBox(str(e), CMD_NAME)
+    finally:
+        _phases.append(extra={"mode": mode, "succeeded": succeeded})
 
 
 def command_destroy(args: adsk.core.CommandEventArgs) -> None:
     global local_handlers
     local_handlers = []
+    _batch_candidates.clear()
     futil.log(f"{CMD_NAME} Command Destroy Event")
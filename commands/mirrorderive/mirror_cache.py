@@ -0,0 +1,82 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Source → mirror map for Create Mirrored Design.
+
+Records which data file mirrors which source, so a mirror can be refreshed
+in place. The table lives in the add-in's shared cache store (see
+cache_utils.register_cache_table); entries whose source or mirror file has
+been deleted from the hub they were recorded in are removed by the store's
+daily orphan sweep.
+"""
+
+import sqlite3
+
+from ...lib import fusionAddInUtils as futil
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_map (
+    source_id   TEXT PRIMARY KEY,
+    mirror_id   TEXT NOT NULL,
+    mirror_name TEXT NOT NULL,
+    hub_id      TEXT
+);
+"""
+
+
+def _import_legacy(db: sqlite3.Connection, stem: str, payload: dict) -> None:
+    """Copy the mirror_map.json written by earlier releases."""
+    db.executemany(
+        "INSERT OR REPLACE INTO mirror_map VALUES (?, ?, ?, NULL)",
+        [
+            (source_id, entry["mirrorId"], entry.get("mirrorName", ""))
+            for source_id, entry in payload.get("mirrors", {}).items()
+            if entry.get("mirrorId")
+        ],
+    )
+
+
+futil.register_cache_table(
+    "mirror_map",
+    "source_id",
+    _SCHEMA,
+    files_sql="SELECT source_id, hub_id, source_id, mirror_id FROM mirror_map",
+    legacy_prefix="mirror_map",
+    legacy_import=_import_legacy,
+)
+
+
+def lookup_mirror(source_data_file, cmd_name: str) -> str | None:
+    """Return the cached mirror data file id for *source_data_file*, or None."""
+    source_id = getattr(source_data_file, "id", None)
+    if not source_id:
+        return None
+    try:
+        row = futil.cache_store().execute(
+            "SELECT mirror_id FROM mirror_map WHERE source_id = ?", (source_id,)
+        ).fetchone()
+    except Exception:
+        futil.log(f"{cmd_name}: failed to read mirror map — ignoring")
+        return None
+    return row[0] if row else None
+
+
+def record_mirror(source_data_file, mirror_data_file, cmd_name: str) -> None:
+    """Insert or update the mirror entry for *source_data_file*."""
+    source_id = getattr(source_data_file, "id", None)
+    mirror_id = getattr(mirror_data_file, "id", None)
+    if not source_id or not mirror_id:
+        return
+    try:
+        with futil.cache_store() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO mirror_map VALUES (?, ?, ?, ?)",
+                (
+                    source_id,
+                    mirror_id,
+                    getattr(mirror_data_file, "name", ""),
+                    futil.active_hub_id(),
+                ),
+            )
+    except Exception:
+        futil.log(f"{cmd_name}: failed to write mirror map — ignoring")
@@ -0,0 +1,142 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core
+import adsk.fusion
+import os
+
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..hideobjects import visibility
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+CMD_NAME = "Restore Visibility"
+CMD_ID = "PTPM-restorevisibility"
+CMD_DESCRIPTION = (
+    "Restore the visibility that Hide Objects changed in the active design."
+)
+IS_PROMOTED = False
+
+WORKSPACE_ID = config.design_workspace
+TAB_ID = "ToolsTab"
+TAB_NAME = "Tools"
+PANEL_ID = "UtilityPanel"
+PANEL_NAME = "Utility"
+PANEL_AFTER = ""
+
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
+
+local_handlers = []
+
+
+def start() -> None:
+    try:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(
+            CMD_ID, CMD_NAME, CMD_DESCRIPTION, ICON_FOLDER
+        )
+        futil.add_handler(cmd_def.commandCreated, command_created)
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            futil.log(f"Warning: Workspace {WORKSPACE_ID} not found")
+            return
+
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        if toolbar_tab is None:
+            toolbar_tab = workspace.toolbarTabs.add(TAB_ID, TAB_NAME)
+
+        panel = toolbar_tab.toolbarPanels.itemById(PANEL_ID)
+        if panel is None:
+            panel = toolbar_tab.toolbarPanels.add(
+                PANEL_ID, PANEL_NAME, PANEL_AFTER, False
+            )
+
+        control = panel.controls.addCommand(cmd_def, "PTPM-hideobjects", False)
+        control.isPromoted = IS_PROMOTED
+
+        futil.log(f"{CMD_NAME} command started successfully")
+
+    except Exception as e:
+        futil.log(f"Error starting {CMD_NAME}: {e}")
+
+
+def stop() -> None:
+    try:
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            return
+
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        command_control = panel.controls.itemById(CMD_ID) if panel else None
+        command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+        if command_control:
+            command_control.deleteMe()
+
+        if command_definition:
+            command_definition.deleteMe()
+
+        if panel and panel.controls.count == 0:
+            panel.deleteMe()
+
+        if toolbar_tab and toolbar_tab.toolbarPanels.count == 0:
+            toolbar_tab.deleteMe()
+
+        futil.log(f"{CMD_NAME} command stopped successfully")
+
+    except Exception as e:
+        futil.log(f"Error stopping {CMD_NAME}: {e}")
+
+
+def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
+    futil.log(f"{CMD_NAME} Command Created Event")
+
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+def command_execute(args: adsk.core.CommandEventArgs) -> None:
+    try:
+        app = adsk.core.Application.get()
+        design = adsk.fusion.Design.cast(app.activeProduct)
+
+        if not design:
+            ui.messageBox("No active Fusion design.", CMD_NAME)
+            return
+
+        snapshot = visibility.read_snapshot(design)
+        if not snapshot:
+            ui.messageBox(
+                "There is nothing to restore. Run Hide Objects first.", CMD_NAME
+            )
+            return
+
+        restored, unchanged, missing = visibility.restore_snapshot(design, snapshot)
+        visibility.clear_snapshot(design)
+
+        futil.log(
+            f"{CMD_NAME}: restored {restored}, unchanged {unchanged}, "
+            f"missing {missing} of {len(snapshot)} snapshot entries."
+        )
+        message = f"Restored visibility of {restored:,} objects."
+        if unchanged:
+            message += f"\n{unchanged:,} objects already matched and were left untouched."
+        if missing:
+            message += f"\n{missing:,} objects no longer exist and were skipped."
+        ui.messageBox(message, CMD_NAME)
+
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
+
+
+def command_destroy(args: adsk.core.CommandEventArgs) -> None:
+    global local_handlers
+    local_handlers = []
+    futil.log(f"{CMD_NAME} Command Destroy Event")
@@ -0,0 +1,185 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core
+import adsk.fusion
+import os
+import time
+
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..sketchunderconstrained import audit
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+CMD_NAME = "Audit Sketch Constraints"
+CMD_ID = "PTPM-sketchaudit"
+CMD_DESCRIPTION = (
+    "List every sketch in the design that still has under-constrained "
+    "geometry. Unchanged sketches reuse their previous result."
+)
+IS_PROMOTED = False
+
+WORKSPACE_ID = config.design_workspace
+TAB_ID = "SolidTab"
+TAB_NAME = "Solid"
+PANEL_ID = "InspectPanel"
+PANEL_NAME = "Inspect"
+CMD_AFTER = "PTPM-timelinecompute"
+
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
+
+# Sketches listed in the result message; the full list is logged.
+MAX_REPORT_LINES = 15
+
+local_handlers = []
+
+
+def start() -> None:
+    try:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(
+            CMD_ID, CMD_NAME, CMD_DESCRIPTION, ICON_FOLDER
+        )
+        futil.add_handler(cmd_def.commandCreated, command_created)
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            futil.log(f"Warning: Workspace {WORKSPACE_ID} not found")
+            return
+
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        if toolbar_tab is None:
+            toolbar_tab = workspace.toolbarTabs.add(TAB_ID, TAB_NAME)
+
+        panel = toolbar_tab.toolbarPanels.itemById(PANEL_ID)
+        if panel is None:
+            panel = toolbar_tab.toolbarPanels.add(PANEL_ID, PANEL_NAME, "", False)
+
+        control = panel.controls.addCommand(cmd_def, CMD_AFTER, False)
+        control.isPromoted = IS_PROMOTED
+
+        futil.log(f"{CMD_NAME} command started successfully")
+
+    except Exception as e:
+        futil.log(f"Error starting {CMD_NAME}: {e}")
+
+
+def stop() -> None:
+    try:
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            return
+
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        command_control = panel.controls.itemById(CMD_ID) if panel else None
+        command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+        if command_control:
+            command_control.deleteMe()
+
+        if command_definition:
+            command_definition.deleteMe()
+
+        if panel and panel.controls.count == 0:
+            panel.deleteMe()
+
+        if toolbar_tab and toolbar_tab.toolbarPanels.count == 0:
+            toolbar_tab.deleteMe()
+
+        futil.log(f"{CMD_NAME} command stopped successfully")
+
+    except Exception as e:
+        futil.log(f"Error stopping {CMD_NAME}: {e}")
+
+
+def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
+    futil.log(f"{CMD_NAME} Command Created Event")
+
+    inputs = args.command.commandInputs
+    inputs.addBoolValueInput(
+        "recheck_all", "Re-check unchanged sketches", True, "", False
+    )
+
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+def command_execute(args: adsk.core.CommandEventArgs) -> None:
+    try:
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        if not design:
+            ui.messageBox("No active Fusion design.", CMD_NAME)
+            return
+
+        use_cache = not args.command.commandInputs.itemById("recheck_all").value
+
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show(CMD_NAME, "Auditing sketch %v of %m", 0, 1, 0)
+
+        def on_progress(done: int, total: int) -> bool:
+            progress.maximumValue = total
+            progress.progressValue = done
+            adsk.doEvents()
+            return not progress.wasCancelled
+
+        t0 = time.perf_counter()
+        try:
+            records, checked, reused, cancelled = audit.audit_design(
+                design, use_cache=use_cache, on_progress=on_progress, cmd_name=CMD_NAME
+            )
+        finally:
+            progress.hide()
+        elapsed = time.perf_counter() - t0
+
+        _report(records, checked, reused, cancelled, elapsed)
+
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
+
+
+def _report(
+    records: dict, checked: int, reused: int, cancelled: bool, elapsed: float
+) -> None:
+    flagged = sorted(
+        (r for r in records.values() if r["underConstrained"]),
+        key=lambda r: r["underConstrained"],
+        reverse=True,
+    )
+    lines = [
+        f"Audited {len(records)} sketches in {elapsed:.1f} s "
+        f"({checked} checked, {reused} unchanged since the last audit).",
+    ]
+    if cancelled:
+        lines.append("Cancelled; the remaining sketches were not audited.")
+    if not flagged:
+        lines.append("Every audited sketch is fully constrained.")
+    else:
+        lines.append(f"{len(flagged)} sketches have under-constrained geometry:")
+        lines.append("")
+        for record in flagged[:MAX_REPORT_LINES]:
+            kinds = ", ".join(
+                f"{count} {kind}" for kind, count in sorted(record["byType"].items())
+            )
+            lines.append(f"• {record['label']}: {kinds}")
+        if len(flagged) > MAX_REPORT_LINES:
+            lines.append(f"… and {len(flagged) - MAX_REPORT_LINES} more (see the log).")
+
+    for record in flagged:
+        futil.log(
+            f"{CMD_NAME}: {record['label']} — {record['underConstrained']} of "
+            f"{record['checked']} entities under-constrained {record['byType']}"
+        )
+    ui.messageBox("\n".join(lines), CMD_NAME)
+
+
+def command_destroy(args: adsk.core.CommandEventArgs) -> None:
+    global local_handlers
+    local_handlers = []
+    futil.log(f"{CMD_NAME} Command Destroy Event")
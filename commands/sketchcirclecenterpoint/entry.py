@@ -6,6 +6,7 @@ import adsk.fusion
 import os
 import traceback
 import math
+from bisect import bisect_left
 
 from ...lib import fusionAddInUtils as futil
 from ... import config
@@ -31,6 +32,10 @@ ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource
 # Local event handler references – must persist for the lifetime of the command.
 local_handlers = []
 
+# Per-event latency aggregation; active only when config.PERF_TRACE is True.
+# The report is written to the log directory when the command is destroyed.
+_latency = futil.LatencyRecorder(CMD_ID)
+
 # ---------------------------------------------------------------------------
 # Preview state – shared between event handlers
 # ---------------------------------------------------------------------------
@@ -57,6 +62,27 @@ _COMMIT_EVENT_ID   = f"{CMD_ID}_commit"   # custom event used to defer doExecute
 # nor the OK-button fallback creates duplicate geometry.
 _geometry_created: bool = False
 
+# ---------------------------------------------------------------------------
+# Snapping – targets are indexed once when the center is picked so mouseMove
+# never walks sketch.sketchPoints / sketchCircles.
+# ---------------------------------------------------------------------------
+SNAP_TOLERANCE_PX = 10   # snap capture distance, in screen pixels
+
+# Standard drill diameters (cm).  The set matching the design's default
+# length units is offered as snap targets.
+_METRIC_DRILL_DIAMETERS = tuple(d / 10.0 for d in (
+    1.0, 1.5, 2.0, 2.5, 3.0, 3.3, 3.5, 4.0, 4.2, 4.5, 5.0, 5.5, 6.0, 6.8,
+    7.0, 8.0, 8.5, 9.0, 10.0, 10.2, 11.0, 12.0, 13.0, 14.0, 15.0, 16.0,
+    17.5, 18.0, 19.0, 20.0,
+))
+_INCH_DRILL_DIAMETERS = tuple(n / 64.0 * 2.54 for n in range(4, 65))   # 1/16" – 1" in 1/64" steps
+
+_snap_index = None                                        # _SnapIndex for the current center
+_snap_enabled: bool = True                                # mirrors the "snap" checkbox
+_last_hit_offset: tuple[float, float] | None = None       # sketch-local (a, b) of last mouse hit
+_last_px_per_cm: float = 0.0                              # screen pixels per sketch cm at last hit
+_snap_label: str = ""                                     # text currently shown in snap_info
+
 
 # ---------------------------------------------------------------------------
 # Add-in lifecycle
@@ -151,6 +177,10 @@ def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
             adsk.core.ValueInput.createByReal(2.5),
         )
 
+        inputs.addBoolValueInput("snap", "Snap", True, "", True)
+        snap_info = inputs.addTextBoxCommandInput("snap_info", "Snapped to", "", 1, True)
+        snap_info.isFullWidth = False
+
         # Wire up all event handlers
         futil.add_handler(cmd.execute,         command_execute,         local_handlers=local_handlers)
         futil.add_handler(cmd.executePreview,  command_execute_preview, local_handlers=local_handlers)
@@ -176,7 +206,11 @@ def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
 # ---------------------------------------------------------------------------
 
 def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
-    global _preview_center_model, _preview_sketch, _preview_selected_entity
+    global _preview_center_model, _preview_sketch, _preview_selected_entity, _snap_enabled, _snap_index
+
+    if args.input.id == "snap":
+        _snap_enabled = adsk.core.BoolValueCommandInput.cast(args.input).value
+        return
 
     if args.input.id != "center_point":
         return
@@ -220,6 +254,8 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
                 _vp_offset_x = _selection_click_pos.x - cs_screen.x
                 _vp_offset_y = _selection_click_pos.y - cs_screen.y
 
+        _build_snap_index(design)
+
         # Hide the satisfied selection input so Fusion stops routing mouse
         # events through its selection machinery.  This allows mouseMove to
         # fire freely while the user drags to set the diameter.
@@ -233,6 +269,7 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
         _preview_center_model = None
         _preview_sketch = None
         _preview_selected_entity = None
+        _snap_index = None
         sel_input.isVisible = True
         _clear_preview()
 
@@ -241,6 +278,7 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs) -> None:
 # mouseMove – live preview circle via Custom Graphics
 # ---------------------------------------------------------------------------
 
+@_latency.timed("command_mouse_move")
 def command_mouse_move(args: adsk.core.MouseEventArgs) -> None:
     global _cmd_inputs
 
@@ -260,15 +298,22 @@ def command_mouse_move(args: adsk.core.MouseEventArgs) -> None:
     if radius < 1e-6:
         return
 
+    radius, snapped_offset = _snap_radius(radius, args)
+    if snapped_offset is not None:
+        # Draw the crosshair where the snap put the cursor.
+        hit = _offset_to_model(snapped_offset)
+
     # Push the live diameter value back into the dialog input.
     # This also triggers executePreview which redraws the graphics.
     if _cmd_inputs:
         diam_input: adsk.core.ValueCommandInput = _cmd_inputs.itemById("diameter")
         if diam_input:
             diam_input.value = radius * 2.0
+        _latency.estimate_api_calls(2)   # itemById + value
 
     _update_preview(radius, hit)
     adsk.core.Application.get().activeViewport.refresh()
+    _latency.estimate_api_calls(2)   # activeViewport + refresh
 
 
 # ---------------------------------------------------------------------------
@@ -304,6 +349,8 @@ def command_mouse_click(args: adsk.core.MouseEventArgs) -> None:
     if radius < 1e-6:
         return
 
+    radius, _ = _snap_radius(radius, args)
+
     # Update the diameter input for display consistency.
     if _cmd_inputs:
         diam_input: adsk.core.ValueCommandInput = _cmd_inputs.itemById("diameter")
@@ -345,6 +392,7 @@ def custom_event_commit(args: adsk.core.CustomEventArgs) -> None:
 # executePreview – redraws graphics whenever a dialog input changes
 # ---------------------------------------------------------------------------
 
+@_latency.timed("command_execute_preview")
 def command_execute_preview(args: adsk.core.CommandEventArgs) -> None:
     # Do not actually commit geometry here; just update the graphics preview.
     args.isValidResult = False
@@ -354,11 +402,13 @@ def command_execute_preview(args: adsk.core.CommandEventArgs) -> None:
 
     inputs = args.command.commandInputs
     diameter_input: adsk.core.ValueCommandInput = inputs.itemById("diameter")
+    _latency.estimate_api_calls(4)   # command, commandInputs, itemById, value
     if diameter_input is None or diameter_input.value <= 0:
         return
 
     _update_preview(diameter_input.value / 2.0)
     adsk.core.Application.get().activeViewport.refresh()
+    _latency.estimate_api_calls(2)   # activeViewport + refresh
 
 
 # ---------------------------------------------------------------------------
@@ -412,6 +462,7 @@ def command_execute(args: adsk.core.CommandEventArgs) -> None:
 
 def command_destroy(args: adsk.core.CommandEventArgs) -> None:
     global local_handlers, _cmd_inputs, _preview_center_model, _preview_sketch, _preview_selected_entity, _active_command, _geometry_created, _selection_click_pos, _vp_offset_x, _vp_offset_y
+    global _snap_index, _snap_enabled, _last_hit_offset, _last_px_per_cm, _snap_label
     _clear_preview()
     # Unregister the custom event so it doesn't accumulate across re-runs.
     try:
@@ -428,6 +479,13 @@ def command_destroy(args: adsk.core.CommandEventArgs) -> None:
     _selection_click_pos = None
     _vp_offset_x = 0.0
     _vp_offset_y = 0.0
+    _latency.dump()
+    _latency.reset()
+    _snap_index = None
+    _snap_enabled = True
+    _last_hit_offset = None
+    _last_px_per_cm = 0.0
+    _snap_label = ""
     futil.log(f"{CMD_NAME} Command Destroy Event")
 
 
@@ -517,15 +575,19 @@ def _clear_preview() -> None:
             return
         root = design.rootComponent
         groups = root.customGraphicsGroups
+        _latency.estimate_api_calls(4)   # activeProduct, rootComponent, groups, count
         # Iterate in reverse so index stays valid as items are removed.
         for i in range(groups.count - 1, -1, -1):
             grp = groups.item(i)
             if grp.id == _PREVIEW_GFX_NAME:
                 grp.deleteMe()
+                _latency.estimate_api_calls(1)
+            _latency.estimate_api_calls(2)   # item + id
     except Exception:
         pass
 
 
+@_latency.timed("_update_preview")
 def _update_preview(radius: float, hit: adsk.core.Point3D | None = None) -> None:
     """Clear then redraw the custom graphics preview circle at *radius* (cm),
     with an optional white crosshair at the cursor hit position."""
@@ -556,6 +618,10 @@ def _update_preview(radius: float, hit: adsk.core.Point3D | None = None) -> None
         curve_gfx = graphics.addCurve(circle3d)
         curve_gfx.weight = 1.0
         curve_gfx.color = white
+        # activeProduct, rootComponent, groups.add, id, referencePlane,
+        # geometry, normal, Color, color effect, Circle3D, addCurve, weight,
+        # color
+        _latency.estimate_api_calls(13)
 
         # Crosshair at cursor hit – fixed pixel size regardless of zoom.
         # We compute the model-space arm length that projects to PX_ARM pixels
@@ -598,6 +664,9 @@ def _update_preview(radius: float, hit: adsk.core.Point3D | None = None) -> None
                 lg = graphics.addCurve(adsk.core.Line3D.create(p0, p1))
                 lg.weight = 1.0
                 lg.color = white
+            # modelToSketchSpace, activeViewport, 3x modelToViewSpace,
+            # 6x sketchToModelSpace, 2x (Line3D, addCurve, weight, color)
+            _latency.estimate_api_calls(19)
 
     except Exception:
         futil.log(f"{CMD_NAME} _update_preview failed:\n{traceback.format_exc()}")
@@ -618,6 +687,7 @@ def _mouse_to_sketch_plane(
     then solve for the mouse position in that basis.  args.position is used
     only as a raw 2-D value – no NDC conversion, no camera math needed.
     """
+    global _last_hit_offset, _last_px_per_cm
     try:
         viewport   = args.viewport
         mouse_pos  = args.position   # Point2D – raw coords, any space
@@ -636,6 +706,9 @@ def _mouse_to_sketch_plane(
         cs  = viewport.modelToViewSpace(center_mdl)
         rxs = viewport.modelToViewSpace(ref_x_mdl)
         rys = viewport.modelToViewSpace(ref_y_mdl)
+        # viewport, position, modelToSketchSpace, 2x sketchToModelSpace,
+        # 3x modelToViewSpace
+        _latency.estimate_api_calls(8)
         if cs is None or rxs is None or rys is None:
             return None
 
@@ -665,13 +738,212 @@ def _mouse_to_sketch_plane(
         if radius < 1e-6:
             return None
 
+        # Remember the sketch-local offset and screen scale so snapping can
+        # query the index without further API round-trips.
+        _last_hit_offset = (a, b)
+        _last_px_per_cm = 0.5 * (math.hypot(sxx, sxy) + math.hypot(syx, syy))
+
         # Return the world-space point on the sketch plane at (a, b) from center.
         hit = sketch.sketchToModelSpace(
             adsk.core.Point3D.create(center_local.x + a, center_local.y + b, 0.0)
         )
+        _latency.estimate_api_calls(1)
         return hit
 
     except Exception:
         futil.log(f"{CMD_NAME} _mouse_to_sketch_plane failed:\n{traceback.format_exc()}")
         return None
 
+
+# ===========================================================================
+# Snapping
+# ===========================================================================
+
+class _SnapIndex:
+    """Snap targets for one drag session, built once when the center is picked.
+
+    Sketch points are stored as sketch-local offsets from the circle center and
+    bucketed into a uniform grid, so each mouseMove only inspects the cells
+    around the cursor.  Circle radii and drill radii are sorted lists searched
+    with bisect.  All values are in cm.
+    """
+
+    def __init__(self, points, circle_radii, drill_radii):
+        self._points = points
+        self._circle_radii = sorted({r for r in circle_radii if r > 1e-6})
+        self._drill_radii = sorted({r for r in drill_radii if r > 1e-6})
+
+        # Size cells so a uniformly spread sketch averages ~1 point per cell.
+        if points:
+            xs = [p[0] for p in points]
+            ys = [p[1] for p in points]
+            extent = max(max(xs) - min(xs), max(ys) - min(ys), 1e-3)
+            self._cell = max(extent / math.sqrt(len(points)), 1e-3)
+        else:
+            self._cell = 1.0
+
+        self._grid: dict[tuple[int, int], list[tuple[float, float]]] = {}
+        for x, y in points:
+            key = (math.floor(x / self._cell), math.floor(y / self._cell))
+            self._grid.setdefault(key, []).append((x, y))
+
+    def snap(
+        self, a: float, b: float, tol: float
+    ) -> tuple[float, str, tuple[float, float]] | None:
+        """Return (snapped_radius, kind, snapped_offset) for the target closest
+        to the cursor offset (*a*, *b*), or None when nothing is within *tol*.
+
+        Every target is ranked by how far the cursor would move to reach it:
+        to the point itself for a Point, or radially onto the target circle
+        for a Circle or Drill radius.
+        """
+        radius = math.hypot(a, b)
+        best = None   # (cursor distance, radius, kind, offset)
+
+        point_hit = self._nearest_point(a, b, tol)
+        if point_hit is not None:
+            d, x, y = point_hit
+            best = (d, math.hypot(x, y), "Point", (x, y))
+
+        for kind, values in (("Circle", self._circle_radii), ("Drill", self._drill_radii)):
+            r = _nearest_value(values, radius, tol)
+            if r is None:
+                continue
+            d = abs(r - radius)
+            if best is None or d < best[0]:
+                scale = r / radius
+                best = (d, r, kind, (a * scale, b * scale))
+
+        return best[1:] if best is not None else None
+
+    def _nearest_point(self, a: float, b: float, tol: float) -> tuple[float, float, float] | None:
+        """Return (cursor_distance, x, y) of the nearest point within *tol*."""
+        if not self._points:
+            return None
+
+        reach = int(math.ceil(tol / self._cell))
+        if (2 * reach + 1) ** 2 >= len(self._points):
+            # Zoomed far out: fewer points than cells to visit.
+            candidates = self._points
+        else:
+            ix = math.floor(a / self._cell)
+            iy = math.floor(b / self._cell)
+            candidates = []
+            for gx in range(ix - reach, ix + reach + 1):
+                for gy in range(iy - reach, iy + reach + 1):
+                    candidates.extend(self._grid.get((gx, gy), ()))
+
+        best = None
+        for x, y in candidates:
+            d = math.hypot(x - a, y - b)
+            if d <= tol and (best is None or d < best[0]):
+                best = (d, x, y)
+        return best
+
+
+def _nearest_value(values: list[float], target: float, tol: float) -> float | None:
+    """Return the entry of sorted *values* closest to *target* within *tol*."""
+    i = bisect_left(values, target)
+    best = None
+    for j in (i - 1, i):
+        if 0 <= j < len(values):
+            d = abs(values[j] - target)
+            if d <= tol and (best is None or d < abs(best - target)):
+                best = values[j]
+    return best
+
+
+def _build_snap_index(design: adsk.fusion.Design) -> None:
+    """Index the snap targets of the active sketch around the picked center.
+
+    Called once from inputChanged; this is the only place that walks the
+    sketch's points and circles.
+    """
+    global _snap_index
+    _snap_index = None
+    try:
+        sketch = _preview_sketch
+        center_local = sketch.modelToSketchSpace(_preview_center_model)
+        cx, cy = center_local.x, center_local.y
+
+        points = []
+        for sk_pt in sketch.sketchPoints:
+            g = sk_pt.geometry
+            x, y = g.x - cx, g.y - cy
+            if math.hypot(x, y) > 1e-6:   # skip the center itself
+                points.append((x, y))
+
+        circle_radii = [c.radius for c in sketch.sketchCurves.sketchCircles]
+
+        units = design.unitsManager.defaultLengthUnits
+        drills = _INCH_DRILL_DIAMETERS if units in ("in", "ft") else _METRIC_DRILL_DIAMETERS
+
+        _snap_index = _SnapIndex(points, circle_radii, [d / 2.0 for d in drills])
+        futil.log(
+            f"{CMD_NAME}: snap index built – {len(points)} points, "
+            f"{len(circle_radii)} circles, {len(drills)} drill sizes."
+        )
+    except Exception:
+        futil.log(f"{CMD_NAME} _build_snap_index failed:\n{traceback.format_exc()}")
+
+
+def _snap_radius(
+    radius: float, args: adsk.core.MouseEventArgs
+) -> tuple[float, tuple[float, float] | None]:
+    """Return *radius* snapped to the nearest indexed target within
+    SNAP_TOLERANCE_PX of the cursor, with the snapped sketch-local offset
+    from the center (None when nothing snapped).  Holding Shift or clearing
+    the Snap checkbox suspends snapping."""
+    kind = ""
+    offset = None
+    try:
+        suspended = (
+            not _snap_enabled
+            or bool(args.keyboardModifiers & adsk.core.KeyboardModifiers.ShiftKeyboardModifier)
+        )
+        if (
+            not suspended
+            and _snap_index is not None
+            and _last_hit_offset is not None
+            and _last_px_per_cm > 1e-9
+        ):
+            tol = SNAP_TOLERANCE_PX / _last_px_per_cm
+            snapped = _snap_index.snap(_last_hit_offset[0], _last_hit_offset[1], tol)
+            if snapped is not None:
+                radius, kind, offset = snapped
+    except Exception:
+        futil.log(f"{CMD_NAME} _snap_radius failed:\n{traceback.format_exc()}")
+
+    _set_snap_label(kind, radius)
+    return radius, offset
+
+
+def _offset_to_model(offset: tuple[float, float]) -> adsk.core.Point3D:
+    """Return the model-space point at sketch-local *offset* from the center."""
+    center_local = _preview_sketch.modelToSketchSpace(_preview_center_model)
+    _latency.estimate_api_calls(2)   # modelToSketchSpace + sketchToModelSpace
+    return _preview_sketch.sketchToModelSpace(
+        adsk.core.Point3D.create(center_local.x + offset[0], center_local.y + offset[1], 0.0)
+    )
+
+
+def _set_snap_label(kind: str, radius: float) -> None:
+    """Show the active snap target in the dialog, touching the text box only
+    when the target changes."""
+    global _snap_label
+    label = f"{kind} {radius:.9f}" if kind else ""
+    if label == _snap_label or _cmd_inputs is None:
+        return
+    _snap_label = label
+    try:
+        snap_info = _cmd_inputs.itemById("snap_info")
+        if snap_info is None:
+            return
+        if not kind:
+            snap_info.text = ""
+            return
+        design = adsk.fusion.Design.cast(adsk.core.Application.get().activeProduct)
+        diameter = design.unitsManager.formatInternalValue(radius * 2.0) if design else f"{radius * 2.0:.4f} cm"
+        snap_info.text = f"{kind} \u2300 {diameter}"
+    except Exception:
+        pass
@@ -5,6 +5,7 @@ import adsk.core, adsk.fusion
 import os
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from . import sketches
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -115,8 +116,7 @@ def command_execute(args: adsk.core.CommandCreatedEventArgs):
         if design.activeEditObject and isinstance(
             design.activeEditObject, adsk.fusion.Sketch
         ):
-            app.executeTextCommand("sketch.repairsketch /3")
-            app.executeTextCommand("sketch.repair")
+            sketches.repair_active_sketch()
 
             ui.messageBox("Sketch repaired.", CMD_NAME, 0, 2)
             futil.log(f"{CMD_NAME} Sketch repaired.")
@@ -0,0 +1,88 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Design-wide sketch helpers shared by the sketch commands.
+
+The repair text command only acts on the sketch in edit mode, so repairing
+every sketch means activating each one in turn. These helpers own that
+sequence (select, SketchActivate, work, SketchStop) for sketchrepairall;
+sketchfix shares only the repair step. The under-constrained audit and the
+complexity profiler only use the walking and labelling helpers
+(iter_sketches, sketch_label, is_editable).
+"""
+
+import adsk.core
+import adsk.fusion
+from collections.abc import Iterator
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+# Health states worth repairing; healthy and unknown sketches are skipped.
+UNHEALTHY_STATES = (
+    adsk.fusion.FeatureHealthStates.WarningFeatureHealthState,
+    adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState,
+)
+
+HEALTH_LABELS = {
+    adsk.fusion.FeatureHealthStates.HealthyFeatureHealthState: "healthy",
+    adsk.fusion.FeatureHealthStates.WarningFeatureHealthState: "warning",
+    adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState: "error",
+}
+
+
+def iter_sketches(design: adsk.fusion.Design) -> Iterator[adsk.fusion.Sketch]:
+    """Yield every sketch of every component in *design*, once each."""
+    for component in design.allComponents:
+        for sketch in component.sketches:
+            yield sketch
+
+
+def sketch_label(sketch: adsk.fusion.Sketch) -> str:
+    """Return "<component> / <sketch>" for reports and logs."""
+    return f"{sketch.parentComponent.name} / {sketch.name}"
+
+
+def is_editable(sketch: adsk.fusion.Sketch, design: adsk.fusion.Design) -> bool:
+    """Return False for sketches that cannot be entered for edit.
+
+    Sketches in externally referenced components belong to another design,
+    and rolled-back sketches have no computed state to inspect.
+    """
+    try:
+        if sketch.parentComponent.parentDesign != design:
+            return False
+        timeline_object = sketch.timelineObject
+        if timeline_object and timeline_object.isRolledBack:
+            return False
+    except Exception:
+        return False
+    return True
+
+
+def health_label(sketch: adsk.fusion.Sketch) -> str:
+    return HEALTH_LABELS.get(sketch.healthState, "unknown")
+
+
+def activate_sketch(sketch: adsk.fusion.Sketch, design: adsk.fusion.Design) -> bool:
+    """Enter edit mode on *sketch*; return True once it is the edit object."""
+    ui.activeSelections.clear()
+    ui.activeSelections.add(sketch)
+    app.executeTextCommand("Commands.Start SketchActivate")
+    adsk.doEvents()
+    return design.activeEditObject == sketch
+
+
+def finish_sketch(design: adsk.fusion.Design) -> None:
+    """Leave sketch edit mode if a sketch is being edited."""
+    if isinstance(design.activeEditObject, adsk.fusion.Sketch):
+        app.executeTextCommand("Commands.Start SketchStop")
+        adsk.doEvents()
+    ui.activeSelections.clear()
+
+
+def repair_active_sketch() -> None:
+    """Run both repair passes on the sketch in edit mode."""
+    # Pass 1 removes tiny segments; pass 2 closes gaps between endpoints.
+    app.executeTextCommand("sketch.repairsketch /3")
+    app.executeTextCommand("sketch.repair")
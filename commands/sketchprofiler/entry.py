@@ -0,0 +1,331 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core
+import adsk.fusion
+import csv
+import html
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..sketchfix import sketches
+from ..timelinecompute.entry import HTML_CSS_TEMPLATE
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+CMD_NAME = "Sketch Complexity Report"
+CMD_ID = "PTPM-sketchprofiler"
+CMD_DESCRIPTION = (
+    "Profile every sketch for entities, constraints, dimensions and profiles, "
+    "time its profile build and compute toggle, and rank the most expensive sketches."
+)
+IS_PROMOTED = False
+
+WORKSPACE_ID = config.design_workspace
+TAB_ID = "SolidTab"
+TAB_NAME = "Solid"
+PANEL_ID = "InspectPanel"
+PANEL_NAME = "Inspect"
+CMD_AFTER = "PTPM-sketchaudit"
+
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
+
+# Profiling toggles isComputeDeferred on every sketch. Run inside the
+# command's execute handler, that would land in the undo history as one
+# "Sketch Complexity Report" step, so execute only fires this event and the
+# profiling runs once the command has closed.
+_PROFILE_EVENT_ID = f"{CMD_ID}_profile"
+
+CSV_COLUMNS = [
+    "Component",
+    "Sketch",
+    "Entities",
+    "Constraints",
+    "Dimensions",
+    "Profiles",
+    "Profiles (ms)",
+    "Compute toggle (ms)",
+    "Total (ms)",
+]
+
+local_handlers = []
+
+
+def start() -> None:
+    try:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(
+            CMD_ID, CMD_NAME, CMD_DESCRIPTION, ICON_FOLDER
+        )
+        futil.add_handler(cmd_def.commandCreated, command_created)
+
+        custom_event = app.registerCustomEvent(_PROFILE_EVENT_ID)
+        futil.add_handler(custom_event, custom_event_profile)
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            futil.log(f"Warning: Workspace {WORKSPACE_ID} not found")
+            return
+
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        if toolbar_tab is None:
+            toolbar_tab = workspace.toolbarTabs.add(TAB_ID, TAB_NAME)
+
+        panel = toolbar_tab.toolbarPanels.itemById(PANEL_ID)
+        if panel is None:
+            panel = toolbar_tab.toolbarPanels.add(PANEL_ID, PANEL_NAME, "", False)
+
+        control = panel.controls.addCommand(cmd_def, CMD_AFTER, False)
+        control.isPromoted = IS_PROMOTED
+
+        futil.log(f"{CMD_NAME} command started successfully")
+
+    except Exception as e:
+        futil.log(f"Error starting {CMD_NAME}: {e}")
+
+
+def stop() -> None:
+    try:
+        try:
+            app.unregisterCustomEvent(_PROFILE_EVENT_ID)
+        except Exception:
+            pass
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            return
+
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        command_control = panel.controls.itemById(CMD_ID) if panel else None
+        command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+        if command_control:
+            command_control.deleteMe()
+
+        if command_definition:
+            command_definition.deleteMe()
+
+        if panel and panel.controls.count == 0:
+            panel.deleteMe()
+
+        if toolbar_tab and toolbar_tab.toolbarPanels.count == 0:
+            toolbar_tab.deleteMe()
+
+        futil.log(f"{CMD_NAME} command stopped successfully")
+
+    except Exception as e:
+        futil.log(f"Error stopping {CMD_NAME}: {e}")
+
+
+def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
+    futil.log(f"{CMD_NAME} Command Created Event")
+
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+def command_execute(args: adsk.core.CommandEventArgs) -> None:
+    try:
+        if not adsk.fusion.Design.cast(app.activeProduct):
+            ui.messageBox("No active Fusion design.", CMD_NAME)
+            return
+        app.fireCustomEvent(_PROFILE_EVENT_ID)
+
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
+
+
+def custom_event_profile(args: adsk.core.CustomEventArgs) -> None:
+    try:
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        if not design:
+            return
+
+        all_sketches = [
+            sketch
+            for sketch in sketches.iter_sketches(design)
+            if sketches.is_editable(sketch, design)
+        ]
+        if not all_sketches:
+            ui.messageBox("The design has no sketches to profile.", CMD_NAME)
+            return
+
+        rows = []
+        progress = ui.createProgressDialog()
+        progress.isCancelButtonShown = True
+        progress.show(CMD_NAME, "Profiling sketch %v of %m", 0, len(all_sketches), 0)
+        try:
+            for i, sketch in enumerate(all_sketches):
+                if progress.wasCancelled:
+                    break
+                progress.progressValue = i
+                rows.append(_profile_sketch(sketch))
+                adsk.doEvents()
+        finally:
+            progress.hide()
+
+        # Most expensive first.
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+
+        # Both files are named after the document, so the CSV sits next to
+        # the report it links from and a rerun replaces them.
+        doc_name = app.activeDocument.name
+        safe_name = re.sub(r"[^\w\-]", "_", doc_name)
+        stem = os.path.join(tempfile.gettempdir(), f"sketch_profile_{safe_name}")
+        csv_filepath = _write_csv(rows, f"{stem}.csv")
+        html_filepath = _generate_html_report(doc_name, rows, len(all_sketches), f"{stem}.html")
+        futil.log(
+            f"{CMD_NAME}: profiled {len(rows)} of {len(all_sketches)} sketches - "
+            f"CSV: {csv_filepath}, HTML: {html_filepath}"
+        )
+
+        app.executeTextCommand(f"QTWebBrowser.Display file:///{html_filepath}")
+
+    except Exception as e:
+        futil.handle_error(CMD_NAME)
+        ui.messageBox(f"Failed to generate sketch complexity report:\n{e}", CMD_NAME)
+
+
+def _profile_sketch(sketch: adsk.fusion.Sketch) -> dict:
+    """Count a sketch's contents and time its profile build and compute toggle.
+
+    The first read of `sketch.profiles` makes Fusion build the closed
+    regions, so it is timed. The compute toggle times deferring the sketch's
+    compute and turning it back on. Fusion may re-solve the sketch when
+    compute resumes, but the API does not say whether it did, so the figure
+    is either a re-solve or just the two property writes; it is not a
+    measured solve time. A sketch the user has deferred is not toggled, and
+    its deferred state is always restored.
+    """
+    t0 = time.perf_counter()
+    profile_count = sketch.profiles.count
+    profiles_ms = (time.perf_counter() - t0) * 1000.0
+
+    toggle_ms = None
+    try:
+        was_deferred = sketch.isComputeDeferred
+        if not was_deferred:
+            t0 = time.perf_counter()
+            try:
+                sketch.isComputeDeferred = True
+                sketch.isComputeDeferred = False
+                toggle_ms = (time.perf_counter() - t0) * 1000.0
+            finally:
+                if sketch.isComputeDeferred != was_deferred:
+                    sketch.isComputeDeferred = was_deferred
+    except Exception:
+        # Direct-modeling and some referenced sketches do not allow it.
+        futil.log(f"{CMD_NAME}: could not toggle compute on {sketches.sketch_label(sketch)}")
+
+    return {
+        "component": sketch.parentComponent.name,
+        "sketch": sketch.name,
+        "entities": sketch.sketchCurves.count + sketch.sketchPoints.count,
+        "constraints": sketch.geometricConstraints.count,
+        "dimensions": sketch.sketchDimensions.count,
+        "profiles": profile_count,
+        "profiles_ms": profiles_ms,
+        "toggle_ms": toggle_ms,
+        "total_ms": profiles_ms + (toggle_ms or 0.0),
+    }
+
+
+def _row_values(row: dict) -> list:
+    return [
+        row["component"],
+        row["sketch"],
+        row["entities"],
+        row["constraints"],
+        row["dimensions"],
+        row["profiles"],
+        f"{row['profiles_ms']:.1f}",
+        "-" if row["toggle_ms"] is None else f"{row['toggle_ms']:.1f}",
+        f"{row['total_ms']:.1f}",
+    ]
+
+
+def _write_csv(rows: list[dict], filepath: str) -> str:
+    with open(filepath, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for row in rows:
+            writer.writerow(_row_values(row))
+    return filepath
+
+
+def _generate_html_report(
+    document_name: str, rows: list[dict], sketch_count: int, filepath: str
+) -> str:
+    total_ms = sum(row["total_ms"] for row in rows) or 1.0
+    name = html.escape(document_name)
+    csv_name = html.escape(Path(filepath).with_suffix(".csv").name)
+
+    parts = [
+        HTML_CSS_TEMPLATE,
+        f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>{name} Sketch Complexity Report</title>
+</head>
+<body>
+    <div class="report-header">
+        <h1>{name} &mdash; Sketch Complexity Report</h1>
+        <div class="subtitle">Sketches ranked from most to least expensive to solve</div>
+    </div>
+
+    <div class="summary-card">
+        <div class="detail"><b>Sketches profiled:</b> {len(rows)} of {sketch_count}</div>
+        <div class="detail"><b>Total measured time:</b> {total_ms / 1000.0:.2f} s</div>
+        <div class="detail"><b>Entities:</b> {sum(r["entities"] for r in rows)} &middot;
+            <b>Constraints:</b> {sum(r["constraints"] for r in rows)} &middot;
+            <b>Dimensions:</b> {sum(r["dimensions"] for r in rows)}</div>
+        <div class="detail"><b>Table data:</b> <a href="{csv_name}">{csv_name}</a></div>
+    </div>
+<div class="timeline-compute-report" role="region" tabindex="0">
+    <h2>Sketch Details</h2>
+    <table>
+        <thead>
+            <tr>
+                <th>Rank</th>
+                {"".join(f"<th>{html.escape(c)}</th>" for c in CSV_COLUMNS)}
+                <th>Share</th>
+            </tr>
+        </thead>
+        <tbody>""",
+    ]
+    for rank, row in enumerate(rows, start=1):
+        cells = "".join(f"<td>{html.escape(str(v))}</td>" for v in _row_values(row))
+        share = round(row["total_ms"] / total_ms * 100)
+        parts.append(f"<tr><td>{rank}</td>{cells}<td>{share}%</td></tr>")
+    parts.append(
+        """        </tbody>
+    </table>
+</div>
+
+<div class="report-footer">
+    Power Tools Sketch Complexity &middot; IMA LLC
+</div>
+</body>
+</html>"""
+    )
+
+    with open(filepath, "w", encoding="utf-8") as f:
+        f.write("\n".join(parts))
+    return Path(filepath).as_posix()
+
+
+def command_destroy(args: adsk.core.CommandEventArgs) -> None:
+    global local_handlers
+    local_handlers = []
+    futil.log(f"{CMD_NAME} Command Destroy Event")
@@ -0,0 +1,274 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+import adsk.core
+import adsk.fusion
+import os
+import time
+
+from ...lib import fusionAddInUtils as futil
+from ... import config
+from ..sketchfix import sketches
+
+app = adsk.core.Application.get()
+ui = app.userInterface
+
+CMD_NAME = "Repair All Sketches"
+CMD_ID = "PTPM-sketchrepairall"
+CMD_DESCRIPTION = (
+    "Repair every sketch in the active design that reports an error or "
+    "warning. Healthy sketches are left untouched."
+)
+IS_PROMOTED = False
+
+WORKSPACE_ID = config.design_workspace
+TAB_ID = "ToolsTab"
+TAB_NAME = "Tools"
+PANEL_ID = "UtilityPanel"
+PANEL_NAME = "Utility"
+PANEL_AFTER = ""
+
+ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "")
+
+# The repair text commands need the sketch in edit mode, and edit mode
+# cannot be entered from inside a command event handler, so the repair
+# pass runs from this custom event after the command has finished.
+_REPAIR_EVENT_ID = f"{CMD_ID}_repair"
+
+# Per-sketch lines shown in each section of the result message; the full
+# list is logged.
+MAX_REPORT_LINES = 15
+
+# Result states for queued sketches that were not repaired.
+MISSING = "missing"
+NOT_EDITABLE = "could not edit"
+
+local_handlers = []
+
+# Work handed from command_execute to the custom event:
+# [(entity token, label, health before repair)]
+_pending: list[tuple[str, str, str]] = []
+_screened_count = 0
+
+
+def start() -> None:
+    try:
+        cmd_def = ui.commandDefinitions.addButtonDefinition(
+            CMD_ID, CMD_NAME, CMD_DESCRIPTION, ICON_FOLDER
+        )
+        futil.add_handler(cmd_def.commandCreated, command_created)
+
+        custom_event = app.registerCustomEvent(_REPAIR_EVENT_ID)
+        futil.add_handler(custom_event, custom_event_repair)
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            futil.log(f"Warning: Workspace {WORKSPACE_ID} not found")
+            return
+
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        if toolbar_tab is None:
+            toolbar_tab = workspace.toolbarTabs.add(TAB_ID, TAB_NAME)
+
+        panel = toolbar_tab.toolbarPanels.itemById(PANEL_ID)
+        if panel is None:
+            panel = toolbar_tab.toolbarPanels.add(
+                PANEL_ID, PANEL_NAME, PANEL_AFTER, False
+            )
+
+        control = panel.controls.addCommand(cmd_def, "PTPM-restorevisibility", False)
+        control.isPromoted = IS_PROMOTED
+
+        futil.log(f"{CMD_NAME} command started successfully")
+
+    except Exception as e:
+        futil.log(f"Error starting {CMD_NAME}: {e}")
+
+
+def stop() -> None:
+    try:
+        try:
+            app.unregisterCustomEvent(_REPAIR_EVENT_ID)
+        except Exception:
+            pass
+
+        workspace = ui.workspaces.itemById(WORKSPACE_ID)
+        if not workspace:
+            return
+
+        panel = workspace.toolbarPanels.itemById(PANEL_ID)
+        toolbar_tab = workspace.toolbarTabs.itemById(TAB_ID)
+        command_control = panel.controls.itemById(CMD_ID) if panel else None
+        command_definition = ui.commandDefinitions.itemById(CMD_ID)
+
+        if command_control:
+            command_control.deleteMe()
+
+        if command_definition:
+            command_definition.deleteMe()
+
+        if panel and panel.controls.count == 0:
+            panel.deleteMe()
+
+        if toolbar_tab and toolbar_tab.toolbarPanels.count == 0:
+            toolbar_tab.deleteMe()
+
+        futil.log(f"{CMD_NAME} command stopped successfully")
+
+    except Exception as e:
+        futil.log(f"Error stopping {CMD_NAME}: {e}")
+
+
+def command_created(args: adsk.core.CommandCreatedEventArgs) -> None:
+    futil.log(f"{CMD_NAME} Command Created Event")
+
+    inputs = args.command.commandInputs
+    inputs.addBoolValueInput(
+        "include_warnings", "Include sketches with warnings", True, "", True
+    )
+
+    futil.add_handler(
+        args.command.execute, command_execute, local_handlers=local_handlers
+    )
+    futil.add_handler(
+        args.command.destroy, command_destroy, local_handlers=local_handlers
+    )
+
+
+def command_execute(args: adsk.core.CommandEventArgs) -> None:
+    global _pending, _screened_count
+    try:
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        if not design:
+            ui.messageBox("No active Fusion design.", CMD_NAME)
+            return
+
+        include_warnings = args.command.commandInputs.itemById("include_warnings").value
+        targets = (
+            sketches.UNHEALTHY_STATES
+            if include_warnings
+            else (adsk.fusion.FeatureHealthStates.ErrorFeatureHealthState,)
+        )
+
+        # Screening reads healthState only; no sketch is entered or recomputed.
+        _pending = []
+        _screened_count = 0
+        for sketch in sketches.iter_sketches(design):
+            _screened_count += 1
+            if sketch.healthState not in targets:
+                continue
+            if not sketches.is_editable(sketch, design):
+                continue
+            _pending.append(
+                (sketch.entityToken, sketches.sketch_label(sketch), sketches.health_label(sketch))
+            )
+
+        futil.log(
+            f"{CMD_NAME}: screened {_screened_count} sketches, "
+            f"{len(_pending)} need repair"
+        )
+        if not _pending:
+            ui.messageBox(
+                f"All {_screened_count} sketches are healthy. Nothing was repaired.",
+                CMD_NAME,
+            )
+            return
+
+        app.fireCustomEvent(_REPAIR_EVENT_ID)
+
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
+
+
+def custom_event_repair(args: adsk.core.CustomEventArgs) -> None:
+    global _pending
+    work, _pending = _pending, []
+    design = adsk.fusion.Design.cast(app.activeProduct)
+    if not work or not design:
+        return
+
+    # [(label, before, after, elapsed_ms)]
+    results: list[tuple[str, str, str, float]] = []
+    progress = ui.createProgressDialog()
+    progress.isCancelButtonShown = True
+    progress.show(CMD_NAME, "Repairing sketch %v of %m", 0, len(work), 0)
+    try:
+        for i, (token, label, before) in enumerate(work):
+            if progress.wasCancelled:
+                break
+            progress.progressValue = i
+            progress.message = f"Repairing {label}"
+
+            found = design.findEntityByToken(token)
+            sketch = adsk.fusion.Sketch.cast(found[0]) if found else None
+            if sketch is None:
+                results.append((label, before, MISSING, 0.0))
+                futil.log(f"{CMD_NAME}: {label} no longer found — skipped")
+                continue
+
+            t0 = time.perf_counter()
+            try:
+                if sketches.activate_sketch(sketch, design):
+                    sketches.repair_active_sketch()
+                    after = None
+                else:
+                    after = NOT_EDITABLE
+            finally:
+                sketches.finish_sketch(design)
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            results.append((label, before, after or sketches.health_label(sketch), elapsed_ms))
+            futil.log(
+                f"{CMD_NAME}: {label} {before} → {results[-1][2]} "
+                f"in {elapsed_ms:.0f} ms"
+            )
+    except Exception:
+        futil.handle_error(CMD_NAME, show_message_box=True)
+    finally:
+        progress.hide()
+
+    _report(results, len(work), progress.wasCancelled)
+
+
+def _report(
+    results: list[tuple[str, str, str, float]], queued: int, cancelled: bool
+) -> None:
+    repaired = [r for r in results if r[2] not in (MISSING, NOT_EDITABLE)]
+    missing = [label for label, _, after, _ in results if after == MISSING]
+    not_editable = [label for label, _, after, _ in results if after == NOT_EDITABLE]
+    healthy = sum(1 for _, _, after, _ in repaired if after == "healthy")
+    total_ms = sum(elapsed for _, _, _, elapsed in repaired)
+    lines = [
+        f"Screened {_screened_count} sketches; {queued} reported errors or warnings.",
+        f"Repaired {len(repaired)} in {total_ms / 1000.0:.1f} s; {healthy} are now healthy.",
+    ]
+    if missing:
+        lines.append(f"{len(missing)} could not be found again and were skipped.")
+    if not_editable:
+        lines.append(f"{len(not_editable)} could not be opened for editing.")
+    if cancelled:
+        lines.append(f"Cancelled; {queued - len(results)} sketches were not visited.")
+
+    # Slowest first, so the expensive sketches are visible in long reports.
+    ordered = sorted(repaired, key=lambda r: r[3], reverse=True)
+    entries = [
+        f"• {label}: {before} → {after} ({elapsed:.0f} ms)"
+        for label, before, after, elapsed in ordered
+    ]
+    for heading, section in (
+        ("Repaired:", entries),
+        ("Not found:", [f"• {label}" for label in missing]),
+        ("Could not edit:", [f"• {label}" for label in not_editable]),
+    ):
+        if not section:
+            continue
+        lines += ["", heading] + section[:MAX_REPORT_LINES]
+        if len(section) > MAX_REPORT_LINES:
+            lines.append(f"… and {len(section) - MAX_REPORT_LINES} more (see the log).")
+
+    ui.messageBox("\n".join(lines), CMD_NAME)
+
+
+def command_destroy(args: adsk.core.CommandEventArgs) -> None:
+    global local_handlers
+    local_handlers = []
+    futil.log(f"{CMD_NAME} Command Destroy Event")
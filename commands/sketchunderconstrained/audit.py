@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Design-wide under-constrained audit with per-sketch result caching.
+
+`Sketch.ShowUnderconstrained` only reports on the sketch in edit mode, and
+entering edit mode for hundreds of sketches is slow. The audit reads
+`SketchEntity.isFullyConstrained` through the API instead, so no sketch is
+activated. Results are cached per document (see audit_cache) under a key
+built from the component id and sketch name; a cached record is reused
+while the sketch's `revisionId` is unchanged.
+"""
+
+import adsk.core
+import adsk.fusion
+from collections.abc import Callable
+
+from ..sketchfix import sketches
+from . import audit_cache
+
+# Under-constrained entities kept per record; counts are always complete.
+MAX_ENTITIES_PER_RECORD = 200
+
+# Called as on_progress(done, total); returns False to cancel, like
+# hideobjects.visibility.ChunkCallback.
+ProgressCallback = Callable[[int, int], bool]
+
+
+def sketch_key(sketch: adsk.fusion.Sketch, ordinal: int = 0) -> str:
+    """Return the cache key for *sketch*.
+
+    Component ids persist across sessions, unlike entity tokens. *ordinal*
+    separates sketches that share a name inside one component.
+    """
+    key = f"{sketch.parentComponent.id}/{sketch.name}"
+    return f"{key}#{ordinal}" if ordinal else key
+
+
+def entity_type(entity: adsk.fusion.SketchEntity) -> str:
+    # "adsk::fusion::SketchLine" → "SketchLine"
+    return entity.objectType.rsplit(":", 1)[-1]
+
+
+def _auditable_entities(sketch: adsk.fusion.Sketch):
+    """Yield the curves, then the points, whose constraint state matters.
+
+    Projected (reference) geometry is driven by its source, and the sketch
+    origin point is always fixed, so neither is audited.
+    """
+    for curve in sketch.sketchCurves:
+        if not curve.isReference:
+            yield curve
+    origin = sketch.originPoint
+    for point in sketch.sketchPoints:
+        if point != origin and not point.isReference:
+            yield point
+
+
+def check_sketch(sketch: adsk.fusion.Sketch) -> dict:
+    """Return the audit record for *sketch*."""
+    by_type: dict[str, int] = {}
+    entities: list[dict] = []
+    checked = 0
+
+    for entity in _auditable_entities(sketch):
+        checked += 1
+        if entity.isFullyConstrained:
+            continue
+        kind = entity_type(entity)
+        by_type[kind] = by_type.get(kind, 0) + 1
+        if len(entities) < MAX_ENTITIES_PER_RECORD:
+            entities.append({"type": kind, "token": entity.entityToken})
+
+    return {
+        "label": sketches.sketch_label(sketch),
+        "revisionId": sketch.revisionId,
+        "checked": checked,
+        "underConstrained": sum(by_type.values()),
+        "byType": by_type,
+        "entities": entities,
+    }
+
+
+def under_constrained_entities(
+    sketch: adsk.fusion.Sketch,
+) -> list[adsk.fusion.SketchEntity]:
+    """Return the live under-constrained entities of *sketch*, curves first."""
+    return [
+        entity
+        for entity in _auditable_entities(sketch)
+        if not entity.isFullyConstrained
+    ]
+
+
+def audit_design(
+    design: adsk.fusion.Design,
+    *,
+    use_cache: bool = True,
+    on_progress: ProgressCallback | None = None,
+    cmd_name: str = "",
+) -> tuple[dict, int, int, bool]:
+    """Audit every sketch in *design*.
+
+    Returns (records keyed by sketch_key, sketches checked, records reused
+    from the cache, cancelled). The document's cached records are replaced
+    in the cache store, in one transaction, only if something changed and
+    the run was not cancelled.
+    """
+    document = design.parentDocument
+    cached = audit_cache.read_sketch_audit_cache(document, cmd_name) if use_cache else {}
+
+    all_sketches = list(sketches.iter_sketches(design))
+    records: dict[str, dict] = {}
+    checked = reused = 0
+    seen: dict[str, int] = {}
+    cancelled = False
+
+    for i, sketch in enumerate(all_sketches):
+        if on_progress and not on_progress(i, len(all_sketches)):
+            cancelled = True
+            break
+
+        base_key = sketch_key(sketch)
+        ordinal = seen.get(base_key, 0)
+        seen[base_key] = ordinal + 1
+        key = sketch_key(sketch, ordinal)
+
+        previous = cached.get(key)
+        if previous and previous.get("revisionId") == sketch.revisionId:
+            records[key] = previous
+            reused += 1
+            continue
+
+        records[key] = check_sketch(sketch)
+        checked += 1
+
+    if not cancelled and (checked or len(records) != len(cached)):
+        audit_cache.write_sketch_audit_cache(document, records, cmd_name)
+    return records, checked, reused, cancelled
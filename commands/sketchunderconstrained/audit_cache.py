@@ -0,0 +1,121 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Per-document cache of sketch under-constrained audit records.
+
+One row per audited sketch, keyed by the document and by audit.sketch_key,
+in the add-in's shared cache store (see cache_utils.register_cache_table).
+A document's records count toward the store's size budget as one entry and
+are dropped once unused for CACHE_MAX_AGE_DAYS.
+
+No document version is stored: freshness is decided per sketch by its
+revisionId, which also changes for unsaved edits that a saved version
+number would miss, and an unchanged sketch stays valid across saves.
+"""
+
+import json
+import re
+import sqlite3
+import time
+
+from ...lib import fusionAddInUtils as futil
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketch_audit_docs (
+    doc_key       TEXT PRIMARY KEY,
+    document_name TEXT NOT NULL,
+    accessed_at   REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sketch_audit (
+    doc_key    TEXT NOT NULL,
+    sketch_key TEXT NOT NULL,
+    record     TEXT NOT NULL,
+    PRIMARY KEY (doc_key, sketch_key)
+);
+"""
+
+
+def _replace(db: sqlite3.Connection, doc_key: str, document_name: str, records: dict) -> None:
+    db.execute(
+        "INSERT OR REPLACE INTO sketch_audit_docs VALUES (?, ?, ?)",
+        (doc_key, document_name, time.time()),
+    )
+    db.execute("DELETE FROM sketch_audit WHERE doc_key = ?", (doc_key,))
+    db.executemany(
+        "INSERT INTO sketch_audit VALUES (?, ?, ?)",
+        [(doc_key, key, json.dumps(record)) for key, record in records.items()],
+    )
+
+
+def _delete(db: sqlite3.Connection, doc_key: str) -> None:
+    db.execute("DELETE FROM sketch_audit WHERE doc_key = ?", (doc_key,))
+    db.execute("DELETE FROM sketch_audit_docs WHERE doc_key = ?", (doc_key,))
+
+
+def _import_legacy(db: sqlite3.Connection, stem: str, payload: dict) -> None:
+    """Copy one sketch_audit_<doc key>.json written by earlier releases."""
+    _replace(
+        db,
+        stem[len("sketch_audit_"):],
+        payload.get("documentName", ""),
+        payload.get("sketches", {}),
+    )
+
+
+futil.register_cache_table(
+    "sketch_audit_docs",
+    "doc_key",
+    _SCHEMA,
+    track_access=True,
+    delete=_delete,
+    size_sql=(
+        "SELECT d.doc_key, d.accessed_at, COALESCE(SUM(length(a.record)), 0)"
+        " FROM sketch_audit_docs d LEFT JOIN sketch_audit a ON a.doc_key = d.doc_key"
+        " GROUP BY d.doc_key"
+    ),
+    legacy_prefix="sketch_audit_",
+    legacy_import=_import_legacy,
+)
+
+
+def document_cache_key(document) -> str | None:
+    """Return a filesystem-safe key for *document*: its data file id once
+    saved, otherwise its creationId (stable for the life of the document)."""
+    data_file = getattr(document, "dataFile", None)
+    raw_key = getattr(data_file, "id", None) or getattr(document, "creationId", None)
+    if not raw_key:
+        return None
+    return re.sub(r"[^\w\-]", "_", raw_key)
+
+
+def read_sketch_audit_cache(document, cmd_name: str) -> dict:
+    """Return {sketch key: audit record} cached for *document*."""
+    doc_key = document_cache_key(document)
+    if doc_key is None:
+        return {}
+    futil.touch_cache_entry("sketch_audit_docs", doc_key)
+    try:
+        rows = futil.cache_store().execute(
+            "SELECT sketch_key, record FROM sketch_audit WHERE doc_key = ?",
+            (doc_key,),
+        ).fetchall()
+        return {sketch_key: json.loads(record) for sketch_key, record in rows}
+    except Exception:
+        futil.log(f"{cmd_name}: failed to read sketch audit cache — ignoring")
+        return {}
+
+
+def write_sketch_audit_cache(document, records: dict, cmd_name: str) -> None:
+    """Persist {sketch key: audit record} for *document*, replacing the old set.
+
+    Records for sketches that no longer exist are dropped because the caller
+    passes only the sketches it visited.
+    """
+    doc_key = document_cache_key(document)
+    if doc_key is None:
+        return
+    try:
+        with futil.cache_store() as db:
+            _replace(db, doc_key, getattr(document, "name", ""), records)
+    except Exception:
+        futil.log(f"{cmd_name}: failed to write sketch audit cache — ignoring")
@@ -5,6 +5,7 @@ import adsk.core, adsk.fusion
 import os
 from ...lib import fusionAddInUtils as futil
 from ... import config
+from . import audit, highlight
 
 app = adsk.core.Application.get()
 ui = app.userInterface
@@ -26,6 +27,12 @@ ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resource
 # they are not released and garbage collected.
 local_handlers = []
 
+# State for one dialog session: the under-constrained entities of the
+# active sketch, the graphics that highlight them and the one being viewed.
+_highlighter: highlight.Highlighter | None = None
+_entities: list = []
+_current_index = -1
+
 
 # Executed when add-in is run.
 def start():
@@ -86,51 +93,100 @@ def stop():
 # Function that is called when a user clicks the corresponding button in the UI.
 # This defines the contents of the command dialog and connects to the command related events.
 def command_created(args: adsk.core.CommandCreatedEventArgs):
+    global _highlighter, _entities
     futil.log(f"{CMD_NAME} Command Created Event")
 
     # Connect to the events that are needed by this command.
     futil.add_handler(
-        args.command.execute, command_execute, local_handlers=local_handlers
+        args.command.inputChanged, command_input_changed, local_handlers=local_handlers
     )
     futil.add_handler(
         args.command.destroy, command_destroy, local_handlers=local_handlers
     )
 
+    inputs = args.command.commandInputs
+    try:
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        sketch = None
+        if design and isinstance(design.activeEditObject, adsk.fusion.Sketch):
+            sketch = design.activeEditObject
+
+        if sketch is None:
+            inputs.addTextBoxCommandInput(
+                "summary", "", "No sketch is currently active.", 1, True
+            )
+            args.command.isOKButtonVisible = False
+            return
 
-def command_execute(args: adsk.core.CommandCreatedEventArgs):
-    # this handles the document close and reopen
-    ui = None
+        under = app.executeTextCommand("Sketch.ShowUnderconstrained")
+        futil.log(f"{CMD_NAME} {under}.")
+        _entities = audit.under_constrained_entities(sketch)
 
-    try:
-        app = adsk.core.Application.get()
-        product = app.activeProduct
-        design = adsk.fusion.Design.cast(product)
-        ui = app.userInterface
-
-        # Check a Design document is active.
-        if not design:
-            ui.messageBox("No active Fusion design", CMD_ID)
+        inputs.addTextBoxCommandInput(
+            "summary", "", _summary_text(_entities), 3, True
+        )
+        if not _entities:
             return
 
-        if design.activeEditObject and isinstance(
-            design.activeEditObject, adsk.fusion.Sketch
-        ):
-            under = app.executeTextCommand("Sketch.ShowUnderconstrained")
-            futil.log(f"{CMD_NAME} {under}.")
+        inputs.addTextBoxCommandInput("current_entity", "Showing", "", 1, True)
+        previous_button = inputs.addBoolValueInput(
+            "previous_entity", "", False, "", False
+        )
+        previous_button.text = "Previous"
+        next_button = inputs.addBoolValueInput("next_entity", "", False, "", False)
+        next_button.text = "Next"
+
+        # Build the highlight once; navigation only recolours it.
+        _highlighter = highlight.Highlighter(design)
+        _highlighter.build(_entities)
+        _show_entity(inputs, 0)
+
+    except:
+        futil.handle_error(CMD_NAME, show_message_box=True)
 
-            ui.messageBox(under, CMD_ID, 0, 2)
 
+def _summary_text(entities: list) -> str:
+    if not entities:
+        return "The sketch is fully constrained."
+    by_type: dict[str, int] = {}
+    for entity in entities:
+        kind = audit.entity_type(entity)
+        by_type[kind] = by_type.get(kind, 0) + 1
+    kinds = ", ".join(f"{count} {kind}" for kind, count in sorted(by_type.items()))
+    return f"{len(entities)} under-constrained entities: {kinds}."
 
-        else:
-            ui.messageBox("No sketch is currently active.", CMD_ID)
 
+def command_input_changed(args: adsk.core.InputChangedEventArgs):
+    if args.input.id not in ("previous_entity", "next_entity") or not _entities:
+        return
+    step = 1 if args.input.id == "next_entity" else -1
+    try:
+        _show_entity(args.inputs, (_current_index + step) % len(_entities))
     except:
-        if ui:
-            futil.handle_error(CMD_NAME, show_message_box=True)
+        futil.handle_error(CMD_NAME)
+
+
+def _show_entity(inputs: adsk.core.CommandInputs, index: int) -> None:
+    """Make entity *index* current: recolour it and centre the view on it."""
+    global _current_index
+    _current_index = index
+    entity = _entities[index]
+    _highlighter.set_current(index)
+    center = highlight.entity_center(entity)
+    if center is not None:
+        highlight.center_view_on(center)
+    inputs.itemById("current_entity").text = (
+        f"{index + 1} of {len(_entities)}: {audit.entity_type(entity)}"
+    )
 
 
 # This function will be called when the user completes the command.
 def command_destroy(args: adsk.core.CommandEventArgs):
-    global local_handlers
+    global local_handlers, _highlighter, _entities, _current_index
     local_handlers = []
+    if _highlighter is not None:
+        _highlighter.clear()
+    _highlighter = None
+    _entities = []
+    _current_index = -1
     futil.log(f"{CMD_NAME} Command Destroy Event")
@@ -0,0 +1,123 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Viewport highlighting for under-constrained sketch entities.
+
+One custom-graphics group holds one graphic per entity. It is built once
+when the command opens; moving between entities only recolours the
+previous and the new current graphic, so stepping through a large sketch
+costs two property writes instead of a rebuild.
+"""
+
+import adsk.core
+import adsk.fusion
+
+app = adsk.core.Application.get()
+
+HIGHLIGHT_COLOR = (255, 140, 0)  # orange: under-constrained
+CURRENT_COLOR = (220, 0, 120)  # magenta: the entity being inspected
+CURVE_WEIGHT = 3
+CURRENT_CURVE_WEIGHT = 5
+
+
+def _color_effect(rgb: tuple[int, int, int]) -> adsk.fusion.CustomGraphicsSolidColorEffect:
+    return adsk.fusion.CustomGraphicsSolidColorEffect.create(
+        adsk.core.Color.create(*rgb, 255)
+    )
+
+
+def entity_center(entity: adsk.fusion.SketchEntity) -> adsk.core.Point3D | None:
+    """Return a world-space point on *entity* to centre the view on."""
+    geometry = entity.worldGeometry
+    if isinstance(geometry, adsk.core.Point3D):
+        return geometry
+    evaluator = getattr(geometry, "evaluator", None)
+    if evaluator is None:
+        return None
+    ok, start, end = evaluator.getParameterExtents()
+    if not ok:
+        return None
+    ok, point = evaluator.getPointAtParameter((start + end) / 2.0)
+    return point if ok else None
+
+
+class Highlighter:
+    """Owns the custom-graphics group for one command session."""
+
+    def __init__(self, design: adsk.fusion.Design):
+        self._design = design
+        self._group: adsk.fusion.CustomGraphicsGroup | None = None
+        self._graphics: list[adsk.fusion.CustomGraphicsEntity | None] = []
+        self._current = -1
+        self._normal = _color_effect(HIGHLIGHT_COLOR)
+        self._highlight = _color_effect(CURRENT_COLOR)
+
+    def build(self, entities: list[adsk.fusion.SketchEntity]) -> None:
+        """Create one graphic per entity. Call once per session."""
+        self._group = self._design.rootComponent.customGraphicsGroups.add()
+        for entity in entities:
+            self._graphics.append(self._add_graphic(entity))
+        app.activeViewport.refresh()
+
+    def _add_graphic(
+        self, entity: adsk.fusion.SketchEntity
+    ) -> adsk.fusion.CustomGraphicsEntity | None:
+        try:
+            geometry = entity.worldGeometry
+            if isinstance(geometry, adsk.core.Point3D):
+                coords = adsk.fusion.CustomGraphicsCoordinates.create(geometry.asArray())
+                graphic = self._group.addPointSet(
+                    coords,
+                    [0],
+                    adsk.fusion.CustomGraphicsPointTypes.PointCloudCustomGraphicsPointType,
+                    "",
+                )
+            else:
+                graphic = self._group.addCurve(geometry)
+                graphic.weight = CURVE_WEIGHT
+            graphic.color = self._normal
+            return graphic
+        except Exception:
+            # An entity without drawable geometry keeps its slot so indices
+            # stay aligned with the navigation list.
+            return None
+
+    def set_current(self, index: int) -> None:
+        """Recolour the previous and new current graphic in place."""
+        if index == self._current:
+            return
+        self._style(self._current, self._normal, CURVE_WEIGHT)
+        self._style(index, self._highlight, CURRENT_CURVE_WEIGHT)
+        self._current = index
+        app.activeViewport.refresh()
+
+    def _style(self, index: int, effect, weight: int) -> None:
+        if not 0 <= index < len(self._graphics):
+            return
+        graphic = self._graphics[index]
+        if graphic is None:
+            return
+        graphic.color = effect
+        if isinstance(graphic, adsk.fusion.CustomGraphicsCurve):
+            graphic.weight = weight
+
+    def clear(self) -> None:
+        if self._group is not None and self._group.isValid:
+            self._group.deleteMe()
+            app.activeViewport.refresh()
+        self._group = None
+        self._graphics = []
+        self._current = -1
+
+
+def center_view_on(point: adsk.core.Point3D) -> None:
+    """Pan the active viewport so *point* is the camera target."""
+    viewport = app.activeViewport
+    camera = viewport.camera
+    offset = camera.target.vectorTo(camera.eye)
+    eye = point.copy()
+    eye.translateBy(offset)
+    camera.target = point
+    camera.eye = eye
+    camera.isSmoothTransition = True
+    viewport.camera = camera
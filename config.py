@@ -7,6 +7,12 @@ import json
 from .lib import fusionAddInUtils as futil
 
 DEBUG = False
+# Emit [PERF] timings and write latency reports for interactive commands.
+PERF_TRACE = False
+# Local cache budget (cache/powertools_cache.db). Entries unused for this many
+# days are dropped, and the least recently used are evicted above this size.
+CACHE_MAX_AGE_DAYS = 90
+CACHE_MAX_MB = 50
 ADDIN_NAME = os.path.basename(os.path.dirname(__file__))
 COMPANY_NAME = "IMA LLC"
 
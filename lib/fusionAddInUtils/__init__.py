@@ -10,4 +10,5 @@ from .attributes_utils import *
 from .cache_utils import *
 from .date_utils import *
 from .log_utils import *
+from .perf_utils import *
 from .upload_utils import *
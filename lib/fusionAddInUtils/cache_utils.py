@@ -1,21 +1,53 @@
 """Shared caching and Hub-discovery utilities for PowerTools Global Parameters commands.
 
 All three commands (globalParameters, linkGlobalParameters, refreshGlobalParametersCache)
-use the same cache file formats.  This module owns those formats so they stay in sync.
+use the same cache store.  This module owns its schema so they stay in sync.
 
-Cache files (all written under add-in/cache/):
-  gp_folder_<project-key>.json   — _Global Parameters folder id per project
-  gp_docs_<project-key>.json     — parameter-set doc names and ids per project
-  gp_params_<safe-doc-id>.json   — parameter sidecar written by globalParameters on save;
-                                    lets linkGlobalParameters preview without opening the doc
+Everything lives in one SQLite database, add-in/cache/powertools_cache.db, opened
+once per session in WAL mode.  Each cache is an indexed table, so a lookup or an
+upsert touches one row instead of parsing and rewriting a whole JSON file:
+  gp_folders      — _Global Parameters folder id per project, with the time it was
+                    found; stale entries are still served and re-checked at idle
+  gp_docs         — parameter-set doc names and ids per project, in insertion order,
+                    with the version and modified date last seen by list_param_docs
+  gp_params       — parameter sidecar written by globalParameters on save;
+                    lets linkGlobalParameters preview without opening the doc
+
+The folder, docs and sidecar reads are memoized in process (see "Read memo"):
+a repeated lookup costs one PRAGMA data_version check instead of a query and
+a JSON parse.
+
+Commands with a cache of their own keep its table next to the command and add
+it to this store with register_cache_table() (see "Cache tables"): mirrorderive's
+source → mirror map (commands/mirrorderive/mirror_cache.py) and the sketch
+under-constrained audit (commands/sketchunderconstrained/audit_cache.py).
+
+The store keeps itself within a budget (see "Cache budget"): once per session,
+at idle time, entries unused for CACHE_MAX_AGE_DAYS are dropped, the least
+recently used are evicted while cached payloads exceed CACHE_MAX_MB, and
+entries whose Hub files no longer resolve are removed.
+
+Earlier releases wrote one JSON file per entry (gp_folder_*.json, gp_docs_*.json,
+gp_params_*.json, sketch_audit_*.json, ...).  They are imported into the
+database the first time it is created, or when a registered table that owns
+them is first added, and then removed.  Their *_cache_path
+helpers remain as deprecated shims that return None; use the clear_* helpers
+to drop an entry.
 """
 
 import adsk.core
+import glob
+from collections import OrderedDict
+from collections.abc import Callable
 import os
 import json
 import re
+import sqlite3
+import time
+import warnings
 
 from . import general_utils as futil
+from .event_utils import add_handler
 
 app = adsk.core.Application.get()
 
@@ -27,6 +59,390 @@ _ADDIN_ROOT = os.path.dirname(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 )
 CACHE_FOLDER = os.path.join(_ADDIN_ROOT, "cache")
+CACHE_DB_PATH = os.path.join(CACHE_FOLDER, "powertools_cache.db")
+
+# Version of _SCHEMA, the tables this module owns; stored in PRAGMA
+# user_version.  Registered tables track their own (see register_cache_table).
+CACHE_SCHEMA_VERSION = 1
+
+# Seconds a cached Global Parameters folder id is trusted without re-checking.
+# Older entries are still used immediately; a re-scan is queued for idle time.
+GLOBAL_PARAMS_FOLDER_TTL_S = 60 * 60
+
+# WAL compaction.  A commit appends its changed pages to the WAL; SQLite folds
+# the WAL back into the database every CACHE_WAL_AUTOCHECKPOINT pages, and the
+# WAL file is truncated to CACHE_WAL_SIZE_LIMIT bytes afterwards, so a stream
+# of single-entry upserts costs one small append each and never grows the
+# files without bound.  close_cache_store() checkpoints the rest.
+CACHE_WAL_AUTOCHECKPOINT = 256
+CACHE_WAL_SIZE_LIMIT = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gp_folders (
+    project_key  TEXT PRIMARY KEY,
+    project_name TEXT NOT NULL,
+    folder_id    TEXT NOT NULL,
+    folder_name  TEXT NOT NULL,
+    fetched_at   REAL NOT NULL DEFAULT 0,
+    accessed_at  REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS gp_docs (
+    project_key  TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    name         TEXT NOT NULL,
+    doc_id       TEXT NOT NULL DEFAULT '',
+    version      INTEGER,
+    modified     INTEGER,
+    PRIMARY KEY (project_key, name)
+);
+CREATE INDEX IF NOT EXISTS gp_docs_by_id ON gp_docs (project_key, doc_id);
+CREATE TABLE IF NOT EXISTS gp_params (
+    doc_id      TEXT PRIMARY KEY,
+    doc_name    TEXT NOT NULL,
+    parameters  TEXT NOT NULL,
+    accessed_at REAL NOT NULL DEFAULT 0,
+    hub_id      TEXT
+);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key   TEXT PRIMARY KEY,
+    value REAL
+);
+"""
+
+# Maximum entries held by the in-process read memo.
+CACHE_MEMO_SIZE = 256
+
+_connection: sqlite3.Connection | None = None
+
+# (table, key, ...) → loaded row(s), least recently used first.
+_memo: OrderedDict = OrderedDict()
+_memo_data_version: int | None = None
+
+# Custom event ids are global to Fusion and this package is vendored into
+# every PowerTools add-in, so the ids carry the add-in folder name.
+_REVALIDATE_EVENT_ID = f"{os.path.basename(_ADDIN_ROOT)}_gp_folder_revalidate"
+_MAINTENANCE_EVENT_ID = f"{os.path.basename(_ADDIN_ROOT)}_cache_maintenance"
+_idle_events: dict = {}
+_idle_handlers: list = []
+# project key → (project, cmd_name) waiting for an idle re-scan
+_revalidate_pending: dict = {}
+
+
+# ── Store ─────────────────────────────────────────────────────────────────────
+
+
+def cache_store() -> sqlite3.Connection:
+    """Return the session's cache database connection, opening it on first use.
+
+    Callers wrap writes in `with cache_store() as db:` so each logical update
+    is one transaction.  Errors propagate; the public helpers below catch
+    them and fall back to "no cache", like the JSON files they replace.
+    """
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        connection = sqlite3.connect(CACHE_DB_PATH, timeout=5.0)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL syncs only at checkpoints; a crash can lose the
+        # last few commits but never corrupts the file, which suits a cache.
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA wal_autocheckpoint={CACHE_WAL_AUTOCHECKPOINT}")
+        connection.execute(f"PRAGMA journal_size_limit={CACHE_WAL_SIZE_LIMIT}")
+        _migrate(connection)
+        for table in _cache_tables.values():
+            _apply_cache_table(connection, table)
+        _connection = connection
+        schedule_cache_maintenance()
+    return _connection
+
+
+def close_cache_store() -> None:
+    """Checkpoint and close the cache database; the next helper call reopens it.
+
+    Pending access times are written first.  Idle-time work still queued
+    (folder re-scans, maintenance) is dropped.
+    """
+    global _connection, _memo_data_version, _maintenance_scheduled
+    _stop_idle_events()
+    _maintenance_scheduled = False
+    _memo.clear()
+    _memo_data_version = None
+    if _connection is not None:
+        try:
+            _flush_touches(_connection)
+        except Exception:
+            futil.log("cache_utils: failed to record cache access times — ignoring")
+        try:
+            _connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except Exception:
+            futil.log("cache_utils: WAL checkpoint failed — ignoring")
+        try:
+            _connection.close()
+        finally:
+            _connection = None
+
+
+# ── Read memo ─────────────────────────────────────────────────────────────────
+
+
+def _memo_read(key: tuple, load: Callable[[sqlite3.Connection], object]):
+    """Return the memoized value for *key*, calling load(db) on a miss.
+
+    Writes through this module invalidate their own keys.  Every call, hit or
+    miss, reads PRAGMA data_version; a commit from any other connection
+    changes it, which empties the memo, so a value is never served after the
+    database changed underneath it.
+    Values are shared; callers must copy before handing them out.
+    """
+    global _memo_data_version
+    db = cache_store()
+    (data_version,) = db.execute("PRAGMA data_version").fetchone()
+    if data_version != _memo_data_version:
+        _memo.clear()
+        _memo_data_version = data_version
+    if key in _memo:
+        _memo.move_to_end(key)
+        return _memo[key]
+    value = load(db)
+    _memo[key] = value
+    if len(_memo) > CACHE_MEMO_SIZE:
+        _memo.popitem(last=False)
+    return value
+
+
+def _memo_invalidate(table: str, key: str) -> None:
+    """Drop every memoized read of *table* for *key*."""
+    for memo_key in [k for k in _memo if k[:2] == (table, key)]:
+        del _memo[memo_key]
+
+
+# ── Idle events ───────────────────────────────────────────────────────────────
+
+
+def _fire_at_idle(event_id: str, handler: Callable) -> None:
+    """Fire the custom event *event_id*, registering it with *handler* on first use.
+
+    Fusion delivers a fired custom event once the current handler returns, so
+    work queued this way never runs on a command's own path.
+    """
+    if event_id not in _idle_events:
+        event = app.registerCustomEvent(event_id)
+        add_handler(event, handler, name=f"cache_utils {event_id}", local_handlers=_idle_handlers)
+        _idle_events[event_id] = event
+    app.fireCustomEvent(event_id)
+
+
+def _stop_idle_events() -> None:
+    _revalidate_pending.clear()
+    _orphan_queue.clear()
+    _stop_orphan_resume()
+    for event_id in _idle_events:
+        try:
+            app.unregisterCustomEvent(event_id)
+        except Exception:
+            pass
+    _idle_events.clear()
+    _idle_handlers.clear()
+
+
+def _migrate(connection: sqlite3.Connection) -> None:
+    """Create this module's tables in a new database, then import the JSON cache.
+
+    The sqlite3 module does not open a transaction for DDL by itself, so BEGIN
+    is explicit: a failed step leaves no half-created schema behind.  A later
+    change to _SCHEMA bumps CACHE_SCHEMA_VERSION and adds its upgrade step here.
+    """
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    if version >= CACHE_SCHEMA_VERSION:
+        return
+    with connection:
+        connection.execute("BEGIN")
+        for statement in _SCHEMA.split(";"):
+            if statement.strip():
+                connection.execute(statement)
+        connection.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+    _import_legacy_json(connection, _LEGACY_PREFIXES, _import_legacy_payload)
+
+
+def _load_legacy(path: str) -> dict | None:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            payload = json.load(fh)
+        return payload if isinstance(payload, dict) else None
+    except Exception:
+        return None
+
+
+# File name prefixes written by the JSON cache this database replaces.
+_LEGACY_PREFIXES = ("gp_folder_", "gp_docs_", "gp_params_")
+
+
+def _import_legacy_json(
+    connection: sqlite3.Connection,
+    prefixes: tuple[str, ...],
+    import_payload: Callable[[sqlite3.Connection, str, dict], None],
+) -> None:
+    """Copy the JSON cache files whose names start with *prefixes* into the store.
+
+    import_payload(db, stem, payload) writes one file; it runs in its own
+    transaction.  Imported files are deleted; a file that cannot be parsed is
+    deleted too, since every cache here can be rebuilt from the Hub or the
+    design.
+    """
+    imported = 0
+    for path in glob.glob(os.path.join(CACHE_FOLDER, "*.json")):
+        name = os.path.basename(path)
+        if not name.startswith(prefixes):
+            continue
+        payload = _load_legacy(path)
+        try:
+            if payload is not None:
+                with connection:
+                    import_payload(connection, name[: -len(".json")], payload)
+                imported += 1
+            os.remove(path)
+        except Exception:
+            futil.log(f"cache_utils: failed to import legacy cache {name} — ignoring")
+    if imported:
+        futil.log(f"cache_utils: imported {imported} legacy JSON cache files")
+
+
+def _import_legacy_payload(connection: sqlite3.Connection, stem: str, payload: dict) -> None:
+    if stem.startswith("gp_folder_"):
+        if not payload.get("folderId"):
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO gp_folders VALUES (?, ?, ?, ?, 0, ?)",
+            (
+                stem[len("gp_folder_"):],
+                payload.get("projectName", ""),
+                payload["folderId"],
+                payload.get("folderName", GLOBAL_PARAMS_FOLDER_NAME),
+                time.time(),
+            ),
+        )
+    elif stem.startswith("gp_docs_"):
+        connection.executemany(
+            "INSERT OR IGNORE INTO gp_docs (project_key, project_name, name, doc_id)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (stem[len("gp_docs_"):], payload.get("projectName", ""), d["name"], d.get("id", ""))
+                for d in payload.get("docs", [])
+                if d.get("name")
+            ],
+        )
+    elif stem.startswith("gp_params_"):
+        if not payload.get("docId"):
+            return
+        connection.execute(
+            "INSERT OR REPLACE INTO gp_params VALUES (?, ?, ?, ?, NULL)",
+            (
+                payload["docId"],
+                payload.get("docName", ""),
+                json.dumps(payload.get("parameters", [])),
+                time.time(),
+            ),
+        )
+
+
+# ── Cache tables ──────────────────────────────────────────────────────────────
+
+# table name → registration (see register_cache_table), including this
+# module's own gp_folders and gp_params.
+_cache_tables: dict[str, dict] = {}
+
+
+def register_cache_table(
+    table: str,
+    key_column: str,
+    schema: str = "",
+    *,
+    track_access: bool = False,
+    delete: Callable[[sqlite3.Connection, str], None] | None = None,
+    size_sql: str | None = None,
+    files_sql: str | None = None,
+    legacy_prefix: str | None = None,
+    legacy_import: Callable[[sqlite3.Connection, str, dict], None] | None = None,
+    schema_version: int = 1,
+    migrate: Callable[[sqlite3.Connection, int], None] | None = None,
+) -> None:
+    """Keep a command's cache table in the shared store, under its budget.
+
+    Called at import time by the module that owns the table.  Each row of
+    *table* is one cache entry, identified by *key_column*.
+      schema        — CREATE ... IF NOT EXISTS statements for *table* and
+                      anything that belongs to it, run once to create them
+      schema_version, migrate — the store records the version each table was
+                      created or last upgraded at; when *schema_version* is
+                      higher, migrate(db, old version) upgrades it in one
+                      transaction (without *migrate*, *schema* is run again)
+      track_access  — the table has an accessed_at column, updated through
+                      touch_cache_entry(); entries unused for
+                      CACHE_MAX_AGE_DAYS are evicted
+      delete        — delete(db, key) removes an entry with its dependent
+                      rows; by default only the *table* row is deleted
+      size_sql      — SELECT key, accessed_at, bytes: these entries count
+                      toward CACHE_MAX_MB and are evicted least recently used
+                      first
+      files_sql     — SELECT key, hub id, data file id, ...: the daily orphan
+                      sweep removes an entry once one of its files is gone
+                      from that hub (see _data_file_exists); store the hub
+                      with active_hub_id() when writing the entry
+      legacy_prefix — legacy_import(db, stem, payload) copies each old
+                      cache/<legacy_prefix>*.json file into the table when it
+                      is created
+    """
+    entry = {
+        "table": table,
+        "key_column": key_column,
+        "schema": schema,
+        "track_access": track_access,
+        "delete": delete,
+        "size_sql": size_sql,
+        "files_sql": files_sql,
+        "legacy_prefix": legacy_prefix,
+        "legacy_import": legacy_import,
+        "schema_version": schema_version,
+        "migrate": migrate,
+    }
+    _cache_tables[table] = entry
+    if _connection is not None:
+        try:
+            _apply_cache_table(_connection, entry)
+        except Exception:
+            futil.log(f"cache_utils: failed to create cache table {table} — ignoring")
+
+
+def _apply_cache_table(connection: sqlite3.Connection, entry: dict) -> None:
+    """Create or upgrade a registered table to its schema_version."""
+    if not entry["schema"]:
+        return
+    meta_key = f"schema:{entry['table']}"
+    row = connection.execute(
+        "SELECT value FROM cache_meta WHERE key = ?", (meta_key,)
+    ).fetchone()
+    version = int(row[0]) if row else 0
+    if version >= entry["schema_version"]:
+        return
+    with connection:
+        connection.execute("BEGIN")
+        if version and entry["migrate"] is not None:
+            entry["migrate"](connection, version)
+        else:
+            for statement in entry["schema"].split(";"):
+                if statement.strip():
+                    connection.execute(statement)
+        connection.execute(
+            "INSERT OR REPLACE INTO cache_meta VALUES (?, ?)",
+            (meta_key, entry["schema_version"]),
+        )
+    if not version and entry["legacy_prefix"] and entry["legacy_import"]:
+        _import_legacy_json(connection, (entry["legacy_prefix"],), entry["legacy_import"])
+
+
+def touch_cache_entry(table: str, key: str) -> None:
+    """Record a read of *key* in *table*; written to accessed_at lazily."""
+    _touched[(table, key)] = time.time()
 
 
 # ── Key and path helpers ──────────────────────────────────────────────────────
@@ -39,23 +455,34 @@ def project_cache_key(project) -> str:
     return re.sub(r"[^\w\-]", "_", raw_key)
 
 
-def global_params_folder_cache_path(project) -> str:
-    """Return JSON path used to cache the Global Parameters folder identity."""
-    return os.path.join(CACHE_FOLDER, f"gp_folder_{project_cache_key(project)}.json")
+def _deprecated_path(name: str, replacement: str) -> None:
+    warnings.warn(
+        f"{name}() is deprecated: the JSON cache files are gone; "
+        f"use {replacement}() to drop an entry",
+        DeprecationWarning,
+        stacklevel=3,
+    )
+    return None
 
 
-def param_docs_cache_path(project) -> str:
-    """Return JSON path used to cache parameter-doc names/ids for quick UI load."""
-    return os.path.join(CACHE_FOLDER, f"gp_docs_{project_cache_key(project)}.json")
+def global_params_folder_cache_path(project) -> None:
+    """Deprecated: the folder cache is no longer a file; always returns None.
 
+    Kept so add-ins that predate the SQLite store still import.  None, never
+    the database path, so a caller that deletes the returned file cannot
+    remove the shared store; call clear_global_params_folder_cache() instead.
+    """
+    return _deprecated_path("global_params_folder_cache_path", "clear_global_params_folder_cache")
+
+
+def param_docs_cache_path(project) -> None:
+    """Deprecated: always returns None; call clear_param_docs_cache() instead."""
+    return _deprecated_path("param_docs_cache_path", "clear_param_docs_cache")
 
-def param_set_sidecar_path(data_file) -> str | None:
-    """Return the path for a parameter-set content sidecar for *data_file*, or None."""
-    doc_id = getattr(data_file, "id", None)
-    if not doc_id:
-        return None
-    safe_id = re.sub(r"[^\w\-]", "_", doc_id)
-    return os.path.join(CACHE_FOLDER, f"gp_params_{safe_id}.json")
+
+def param_set_sidecar_path(data_file) -> None:
+    """Deprecated: always returns None; call clear_param_set_sidecar() instead."""
+    return _deprecated_path("param_set_sidecar_path", "clear_param_set_sidecar")
 
 
 # ── Folder cache ──────────────────────────────────────────────────────────────
@@ -63,20 +490,32 @@ def param_set_sidecar_path(data_file) -> str | None:
 
 def read_global_params_folder_cache(project, cmd_name: str) -> dict | None:
     """Read cached Global Parameters folder metadata for the given project."""
-    path = global_params_folder_cache_path(project)
-    if not os.path.exists(path):
-        return None
+    key = project_cache_key(project)
+    touch_cache_entry("gp_folders", key)
     try:
-        with open(path, encoding="utf-8") as fh:
-            payload = json.load(fh)
-        if payload.get("projectName") != project.name:
-            return None
-        if not payload.get("folderId"):
-            return None
-        return payload
+        row = _memo_read(
+            ("gp_folders", key),
+            lambda db: db.execute(
+                "SELECT project_name, folder_id, folder_name, fetched_at"
+                " FROM gp_folders WHERE project_key = ?",
+                (key,),
+            ).fetchone(),
+        )
     except Exception:
         futil.log(f"{cmd_name}: failed to read folder cache — ignoring")
         return None
+    if row is None:
+        return None
+    project_name, folder_id, folder_name, fetched_at = row
+    if project_name != project.name or not folder_id:
+        return None
+    return {
+        "projectName": project_name,
+        "projectKey": key,
+        "folderId": folder_id,
+        "folderName": folder_name,
+        "fetchedAt": fetched_at,
+    }
 
 
 def write_global_params_folder_cache(project, folder, cmd_name: str) -> None:
@@ -84,18 +523,17 @@ def write_global_params_folder_cache(project, folder, cmd_name: str) -> None:
     folder_id = getattr(folder, "id", None)
     if not folder_id:
         return
-    payload = {
-        "projectName": project.name,
-        "projectKey": project_cache_key(project),
-        "folderId": folder_id,
-        "folderName": folder.name,
-    }
+    key = project_cache_key(project)
     try:
-        os.makedirs(CACHE_FOLDER, exist_ok=True)
-        with open(global_params_folder_cache_path(project), "w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2)
+        with cache_store() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO gp_folders VALUES (?, ?, ?, ?, ?, ?)",
+                (key, project.name, folder_id, folder.name, time.time(), time.time()),
+            )
     except Exception:
         futil.log(f"{cmd_name}: failed to write folder cache — ignoring")
+    finally:
+        _memo_invalidate("gp_folders", key)
 
 
 def resolve_global_params_folder_from_cache(project, cmd_name: str):
@@ -146,12 +584,25 @@ def resolve_global_params_folder_from_cache(project, cmd_name: str):
 
 
 def find_global_params_folder(project, cmd_name: str):
-    """Return the '_Global Parameters' DataFolder in the project root, or None."""
+    """Return the '_Global Parameters' DataFolder in the project root, or None.
+
+    A cached folder is returned at once even when it is older than
+    GLOBAL_PARAMS_FOLDER_TTL_S; the stale entry is re-checked by a root folder
+    scan queued for idle time.  Only a cache miss scans in the foreground.
+    """
     with futil.perf_timer("folder cache fast-path", f"{cmd_name}._find_param_folder"):
         cached_folder = resolve_global_params_folder_from_cache(project, cmd_name)
     if cached_folder is not None:
+        cached = read_global_params_folder_cache(project, cmd_name)
+        if cached and time.time() - cached["fetchedAt"] > GLOBAL_PARAMS_FOLDER_TTL_S:
+            schedule_global_params_folder_revalidation(project, cmd_name)
         return cached_folder
 
+    return _scan_for_global_params_folder(project, cmd_name)
+
+
+def _scan_for_global_params_folder(project, cmd_name: str):
+    """Scan the project root for the folder and refresh or drop its cache entry."""
     root = project.rootFolder
     with futil.perf_timer(
         f"rootFolder.dataFolders scan (n={root.dataFolders.count})",
@@ -162,116 +613,267 @@ def find_global_params_folder(project, cmd_name: str):
             if folder.name == GLOBAL_PARAMS_FOLDER_NAME:
                 write_global_params_folder_cache(project, folder, cmd_name)
                 return folder
+    clear_global_params_folder_cache(project, cmd_name)
     return None
 
 
+def clear_global_params_folder_cache(project, cmd_name: str) -> None:
+    """Forget the cached Global Parameters folder for *project*."""
+    key = project_cache_key(project)
+    try:
+        with cache_store() as db:
+            db.execute("DELETE FROM gp_folders WHERE project_key = ?", (key,))
+    except Exception:
+        futil.log(f"{cmd_name}: failed to clear folder cache — ignoring")
+    finally:
+        _memo_invalidate("gp_folders", key)
+
+
+# ── Folder revalidation ───────────────────────────────────────────────────────
+
+
+def schedule_global_params_folder_revalidation(project, cmd_name: str) -> None:
+    """Queue an idle-time re-scan of *project*'s Global Parameters folder.
+
+    The scan runs from a custom event, which Fusion delivers once the current
+    command handler has returned, so the caller never waits on the Hub.
+    Repeated requests for one project before the event fires are coalesced.
+    """
+    key = project_cache_key(project)
+    if key in _revalidate_pending:
+        return
+    try:
+        _revalidate_pending[key] = (project, cmd_name)
+        _fire_at_idle(_REVALIDATE_EVENT_ID, _on_revalidate_folders)
+    except Exception:
+        _revalidate_pending.pop(key, None)
+        futil.log(f"{cmd_name}: could not schedule folder cache refresh — ignoring")
+
+
+def _on_revalidate_folders(args: adsk.core.CustomEventArgs) -> None:
+    while _revalidate_pending:
+        _, (project, cmd_name) = _revalidate_pending.popitem()
+        try:
+            if _scan_for_global_params_folder(project, cmd_name) is None:
+                futil.log(f"{cmd_name}: Global Parameters folder no longer found — cache cleared")
+        except Exception:
+            futil.log(f"{cmd_name}: folder cache refresh failed — ignoring")
+
+
 # ── Docs cache ────────────────────────────────────────────────────────────────
 
 
 def read_param_docs_cache(project, cmd_name: str) -> list[dict]:
     """Return cached parameter-doc entries [{name, id}] for a project."""
-    path = param_docs_cache_path(project)
-    if not os.path.exists(path):
-        return []
+    key = project_cache_key(project)
+    touch_cache_entry("gp_folders", key)
     try:
-        with open(path, encoding="utf-8") as fh:
-            payload = json.load(fh)
-        if payload.get("projectName") != project.name:
-            return []
-        docs = payload.get("docs", [])
-        entries = [
-            {"name": d.get("name", ""), "id": d.get("id", "")}
-            for d in docs
-            if d.get("name")
-        ]
-        # Remove duplicate names while preserving order
-        seen: set = set()
-        deduped = []
-        for entry in entries:
-            name = entry["name"]
-            if name not in seen:
-                seen.add(name)
-                deduped.append(entry)
-        return deduped
+        rows = _memo_read(
+            ("gp_docs", key, project.name),
+            lambda db: db.execute(
+                "SELECT name, doc_id FROM gp_docs"
+                " WHERE project_key = ? AND project_name = ? ORDER BY rowid",
+                (key, project.name),
+            ).fetchall(),
+        )
     except Exception:
         futil.log(f"{cmd_name}: failed to read docs cache — ignoring")
         return []
+    # Names are unique per project (primary key), so no de-duplication.
+    return [{"name": name, "id": doc_id} for name, doc_id in rows]
 
 
 def write_param_docs_cache(project, doc_map: dict, cmd_name: str) -> None:
-    """Persist parameter-doc names/ids for fast startup dropdown population."""
-    docs = [
-        {"name": name, "id": getattr(data_file, "id", "")}
-        for name, data_file in doc_map.items()
-    ]
-    payload = {
-        "projectName": project.name,
-        "projectKey": project_cache_key(project),
-        "docs": docs,
-    }
+    """Persist parameter-doc names/ids for fast startup dropdown population.
+
+    Only each file's id is read.  The version and modified date are left
+    empty, so the next incremental list_param_docs re-reads those files once.
+    """
+    _replace_param_docs(
+        project,
+        [
+            (name, getattr(data_file, "id", "") or "", None, None)
+            for name, data_file in doc_map.items()
+        ],
+        cmd_name,
+    )
+
+
+def _replace_param_docs(project, entries: list[tuple], cmd_name: str) -> None:
+    """Replace the project's docs cache with (name, doc_id, version, modified) rows."""
+    key = project_cache_key(project)
+    rows = [(key, project.name, *entry) for entry in entries if entry[0]]
     try:
-        os.makedirs(CACHE_FOLDER, exist_ok=True)
-        with open(param_docs_cache_path(project), "w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2)
+        with cache_store() as db:
+            db.execute("DELETE FROM gp_docs WHERE project_key = ?", (key,))
+            # A later duplicate name wins, as in the {name: DataFile} map.
+            db.executemany("INSERT OR REPLACE INTO gp_docs VALUES (?, ?, ?, ?, ?, ?)", rows)
     except Exception:
         futil.log(f"{cmd_name}: failed to write docs cache — ignoring")
+    finally:
+        _memo_invalidate("gp_docs", key)
+
+
+def clear_param_docs_cache(project, cmd_name: str) -> None:
+    """Forget every cached parameter-doc entry for *project*."""
+    key = project_cache_key(project)
+    try:
+        with cache_store() as db:
+            db.execute("DELETE FROM gp_docs WHERE project_key = ?", (key,))
+    except Exception:
+        futil.log(f"{cmd_name}: failed to clear docs cache — ignoring")
+    finally:
+        _memo_invalidate("gp_docs", key)
 
 
 def upsert_param_docs_cache_entry(
     project, doc_name: str, doc_id: str, cmd_name: str
 ) -> None:
-    """Insert or update a single parameter-set entry in the project docs cache."""
+    """Insert or update a single parameter-set entry in the project docs cache.
+
+    An existing entry keeps its position and, when *doc_id* is empty, its id.
+    The cost is independent of how many entries the project has: one
+    primary-key probe and at most one row written.  An unchanged entry writes
+    nothing.
+    """
     if not doc_name:
         return
-    path = param_docs_cache_path(project)
-    docs = []
+    key = project_cache_key(project)
     try:
-        if os.path.exists(path):
-            with open(path, encoding="utf-8") as fh:
-                payload = json.load(fh)
-            if payload.get("projectName") == project.name:
-                docs = payload.get("docs", [])
+        with cache_store() as db:
+            _drop_renamed_project_docs(db, key, project.name)
+            # A new id means a different file; clearing its version makes the
+            # next list_param_docs scan re-read it.
+            db.execute(
+                "INSERT INTO gp_docs (project_key, project_name, name, doc_id)"
+                " VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (project_key, name) DO UPDATE SET"
+                " doc_id = excluded.doc_id, version = NULL, modified = NULL"
+                " WHERE excluded.doc_id != '' AND excluded.doc_id != gp_docs.doc_id",
+                (key, project.name, doc_name, doc_id or ""),
+            )
     except Exception:
-        docs = []
-
-    updated = []
-    replaced = False
-    for entry in docs:
-        if entry.get("name") == doc_name:
-            updated.append({"name": doc_name, "id": doc_id or entry.get("id", "")})
-            replaced = True
-        elif entry.get("name"):
-            updated.append({"name": entry.get("name", ""), "id": entry.get("id", "")})
-    if not replaced:
-        updated.append({"name": doc_name, "id": doc_id or ""})
-
-    new_payload = {
-        "projectName": project.name,
-        "projectKey": project_cache_key(project),
-        "docs": updated,
-    }
+        futil.log(f"{cmd_name}: failed to upsert docs cache entry — ignoring")
+    finally:
+        _memo_invalidate("gp_docs", key)
+
+
+def _drop_renamed_project_docs(db: sqlite3.Connection, key: str, project_name: str) -> None:
+    """Delete docs cached under an earlier name of the project.
+
+    Every row of a project carries the same name, so one row decides.
+    """
+    row = db.execute(
+        "SELECT project_name FROM gp_docs WHERE project_key = ? LIMIT 1", (key,)
+    ).fetchone()
+    if row is not None and row[0] != project_name:
+        db.execute("DELETE FROM gp_docs WHERE project_key = ?", (key,))
+
+
+def _read_param_docs_state(project) -> dict:
+    """Return {doc_id: (name, version, modified)} cached for *project*."""
+    rows = cache_store().execute(
+        "SELECT doc_id, name, version, modified FROM gp_docs"
+        " WHERE project_key = ? AND project_name = ?",
+        (project_cache_key(project), project.name),
+    ).fetchall()
+    return {doc_id: (name, version, modified) for doc_id, name, version, modified in rows}
+
+
+def apply_param_docs_delta(
+    project, changed: list[tuple], removed: list[str], cmd_name: str
+) -> None:
+    """Apply a list_param_docs delta to the project docs cache in one transaction.
+
+    *changed* holds (name, doc_id, version, modified) for new or changed files;
+    *removed* holds the ids of files no longer in the folder.  Each row is
+    found through the (project_key, doc_id) index, so the cost follows the
+    size of the delta, not of the folder.
+    """
+    if not changed and not removed:
+        return
+    key = project_cache_key(project)
     try:
-        os.makedirs(CACHE_FOLDER, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as fh:
-            json.dump(new_payload, fh, indent=2)
+        with cache_store() as db:
+            _drop_renamed_project_docs(db, key, project.name)
+            db.executemany(
+                "DELETE FROM gp_docs WHERE project_key = ? AND doc_id = ?",
+                [(key, doc_id) for doc_id in removed]
+                + [(key, doc_id) for _, doc_id, _, _ in changed],
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO gp_docs VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (key, project.name, name, doc_id, version, modified)
+                    for name, doc_id, version, modified in changed
+                ],
+            )
     except Exception:
-        futil.log(f"{cmd_name}: failed to upsert docs cache entry — ignoring")
+        futil.log(f"{cmd_name}: failed to update docs cache — ignoring")
+    finally:
+        _memo_invalidate("gp_docs", key)
+
 
+def list_param_docs(project, cmd_name: str, *, incremental: bool = False) -> dict:
+    """Return {doc_name: DataFile} for all docs in the '_Global Parameters' folder.
 
-def list_param_docs(project, cmd_name: str) -> dict:
-    """Return {doc_name: DataFile} for all docs in the '_Global Parameters' folder."""
+    By default each file's name and id are read from the Hub, as before the
+    docs cache tracked versions, and the cache is rewritten, as explicit
+    refreshes expect.  With *incremental* the folder is still enumerated, to
+    hand back live DataFile objects, but each file's id, version and modified
+    date are read instead; a file whose version and date match the cache
+    takes its name from the cache, and only new, changed and removed files
+    are written back.
+    """
     with futil.perf_timer("find_global_params_folder", f"{cmd_name}._list_param_docs"):
         folder = find_global_params_folder(project, cmd_name)
     if folder is None:
         return {}
+
+    try:
+        known = _read_param_docs_state(project) if incremental else {}
+    except Exception:
+        futil.log(f"{cmd_name}: failed to read docs cache — full scan")
+        known = {}
+
     result = {}
+    changed = []
+    seen = set()
+    data_files = folder.dataFiles
     with futil.perf_timer(
-        f"dataFiles scan (n={folder.dataFiles.count})", f"{cmd_name}._list_param_docs"
+        f"dataFiles delta scan (n={data_files.count}, cached={len(known)})",
+        f"{cmd_name}._list_param_docs",
     ):
-        for i in range(folder.dataFiles.count):
-            df = folder.dataFiles.item(i)
-            result[df.name] = df
-    write_param_docs_cache(project, result, cmd_name)
+        for i in range(data_files.count):
+            df = data_files.item(i)
+            doc_id = df.id
+            if not incremental:
+                # Every Hub property read is a round trip; a full scan
+                # needs only the name and id.
+                name = df.name
+                changed.append((name, doc_id, None, None))
+                result[name] = df
+                continue
+            version = df.versionNumber
+            modified = df.dateModified
+            seen.add(doc_id)
+            cached = known.get(doc_id)
+            if cached is not None and cached[1:] == (version, modified):
+                name = cached[0]
+            else:
+                name = df.name
+                changed.append((name, doc_id, version, modified))
+            result[name] = df
+
+    if not incremental:
+        _replace_param_docs(project, changed, cmd_name)
+        return result
+
+    removed = [doc_id for doc_id in known if doc_id not in seen]
+    futil.log(
+        f"{cmd_name}: docs scan — {len(changed)} new or changed, {len(removed)} removed"
+    )
+    apply_param_docs_delta(project, changed, removed, cmd_name)
     return result
 
 
@@ -279,7 +881,7 @@ def list_param_docs(project, cmd_name: str) -> dict:
 
 
 def write_param_set_sidecar(data_file, parameters: list, cmd_name: str) -> None:
-    """Write a JSON sidecar for a saved parameter set document.
+    """Store the parameter sidecar for a saved parameter set document.
 
     The sidecar lets linkGlobalParameters preview parameters without calling
     app.documents.open(), which switches the active document and is unreliable
@@ -288,8 +890,8 @@ def write_param_set_sidecar(data_file, parameters: list, cmd_name: str) -> None:
     *parameters* is the list of dicts produced by globalParameters._collect_rows()
     with keys: name, value (float), unit, comment (without PT-globparm prefix).
     """
-    path = param_set_sidecar_path(data_file)
-    if path is None:
+    doc_id = getattr(data_file, "id", None)
+    if not doc_id:
         return
     records = [
         {
@@ -300,18 +902,37 @@ def write_param_set_sidecar(data_file, parameters: list, cmd_name: str) -> None:
         }
         for p in parameters
     ]
-    payload = {
-        "docId": getattr(data_file, "id", ""),
-        "docName": getattr(data_file, "name", ""),
-        "parameters": records,
-    }
     try:
-        os.makedirs(CACHE_FOLDER, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as fh:
-            json.dump(payload, fh, indent=2)
-        futil.log(f"{cmd_name}: param set sidecar written → {path}")
+        with cache_store() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO gp_params VALUES (?, ?, ?, ?, ?)",
+                (
+                    doc_id,
+                    getattr(data_file, "name", ""),
+                    json.dumps(records),
+                    time.time(),
+                    active_hub_id(),
+                ),
+            )
+        futil.log(f"{cmd_name}: param set sidecar written → {doc_id}")
     except Exception:
         futil.log(f"{cmd_name}: failed to write param set sidecar — ignoring")
+    finally:
+        _memo_invalidate("gp_params", doc_id)
+
+
+def clear_param_set_sidecar(data_file, cmd_name: str) -> None:
+    """Forget the parameter sidecar stored for *data_file*."""
+    doc_id = getattr(data_file, "id", None)
+    if not doc_id:
+        return
+    try:
+        with cache_store() as db:
+            db.execute("DELETE FROM gp_params WHERE doc_id = ?", (doc_id,))
+    except Exception:
+        futil.log(f"{cmd_name}: failed to clear param set sidecar — ignoring")
+    finally:
+        _memo_invalidate("gp_params", doc_id)
 
 
 def read_param_set_sidecar(data_file) -> list[dict] | None:
@@ -321,18 +942,271 @@ def read_param_set_sidecar(data_file) -> list[dict] | None:
     Returns None (instead of []) when the sidecar is absent or unreadable so
     callers can distinguish 'no cache' from 'empty parameter set'.
     """
-    path = param_set_sidecar_path(data_file)
-    if path is None or not os.path.exists(path):
+    doc_id = getattr(data_file, "id", None)
+    if not doc_id:
         return None
+    touch_cache_entry("gp_params", doc_id)
     try:
-        with open(path, encoding="utf-8") as fh:
-            payload = json.load(fh)
-        # Guard against a stale sidecar that happens to share a safe_id
-        cached_id = payload.get("docId", "")
-        file_id = getattr(data_file, "id", "")
-        if cached_id and file_id and cached_id != file_id:
+        parameters = _memo_read(("gp_params", doc_id), lambda db: _load_sidecar(db, doc_id))
+    except Exception:
+        return None
+    return [dict(p) for p in parameters] if parameters is not None else None
+
+
+def _load_sidecar(db: sqlite3.Connection, doc_id: str) -> list[dict] | None:
+    row = db.execute(
+        "SELECT parameters FROM gp_params WHERE doc_id = ?", (doc_id,)
+    ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+# ── Cache budget ──────────────────────────────────────────────────────────────
+
+# Default cache budget; the add-in's config.py overrides both (see _budget).
+CACHE_MAX_AGE_DAYS = 90
+CACHE_MAX_MB = 50
+
+# Minimum seconds between orphan sweeps; each sweep asks the Hub about every
+# entry of a table registered with files_sql, so it runs at most daily.
+CACHE_ORPHAN_SWEEP_INTERVAL_S = 24 * 60 * 60
+# An orphan sweep checks at most CACHE_ORPHAN_BATCH entries per event, and
+# stops early once CACHE_ORPHAN_BUDGET_S has passed.  Each check is a
+# synchronous Hub lookup, so the sweep then waits for the next command to
+# end before it continues, instead of re-firing straight away.
+CACHE_ORPHAN_BATCH = 2
+CACHE_ORPHAN_BUDGET_S = 0.05
+
+# (table, key) → last read time, written to accessed_at lazily so a cache
+# hit never costs a database write.
+_touched: dict = {}
+# [(table, key, data file ids that must all resolve)] still to check
+_orphan_queue: list = []
+_maintenance_scheduled = False
+# commandTerminated handler that resumes the sweep; present while it is queued
+_orphan_resume_handlers: list = []
+
+
+def _budget() -> tuple[float, float]:
+    """Return (max age in days, max size in MB) from config.py, else the defaults.
+
+    Read at call time: config.py imports this package, so it is still only
+    partly initialised while this module loads.
+    """
+    try:
+        from ... import config
+
+        return (
+            getattr(config, "CACHE_MAX_AGE_DAYS", CACHE_MAX_AGE_DAYS),
+            getattr(config, "CACHE_MAX_MB", CACHE_MAX_MB),
+        )
+    except Exception:
+        return CACHE_MAX_AGE_DAYS, CACHE_MAX_MB
+
+
+def _flush_touches(db: sqlite3.Connection) -> None:
+    if not _touched:
+        return
+    touched = list(_touched.items())
+    _touched.clear()
+    with db:
+        for (table, key), accessed_at in touched:
+            db.execute(
+                f"UPDATE {table} SET accessed_at = ?"
+                f" WHERE {_cache_tables[table]['key_column']} = ? AND accessed_at < ?",
+                (accessed_at, key, accessed_at),
+            )
+
+
+def _delete_entry(db: sqlite3.Connection, table: str, key: str) -> None:
+    """Delete one evictable entry and everything that belongs to it."""
+    entry = _cache_tables[table]
+    if entry["delete"] is not None:
+        entry["delete"](db, key)
+    else:
+        db.execute(f"DELETE FROM {table} WHERE {entry['key_column']} = ?", (key,))
+
+
+def _delete_project(db: sqlite3.Connection, key: str) -> None:
+    db.execute("DELETE FROM gp_docs WHERE project_key = ?", (key,))
+    db.execute("DELETE FROM gp_folders WHERE project_key = ?", (key,))
+
+
+register_cache_table("gp_folders", "project_key", track_access=True, delete=_delete_project)
+register_cache_table(
+    "gp_params",
+    "doc_id",
+    track_access=True,
+    size_sql="SELECT doc_id, accessed_at, length(parameters) FROM gp_params",
+    files_sql="SELECT doc_id, hub_id, doc_id FROM gp_params",
+)
+
+
+def enforce_cache_budget(cmd_name: str = "cache_utils") -> int:
+    """Evict cache entries outside the age and size budget; return how many.
+
+    Entries are the rows of the registered cache tables: projects (folder id
+    plus doc list), parameter sidecars and whatever commands register.  Any
+    entry with access tracking not read for CACHE_MAX_AGE_DAYS is removed.
+    Then, while the entries of tables with a size_sql add up to more than
+    CACHE_MAX_MB, they are removed least recently used first.  Freed
+    pages are reused by later writes; the file is not vacuumed.
+    """
+    db = cache_store()
+    _flush_touches(db)
+    max_age_days, max_mb = _budget()
+    cutoff = time.time() - max_age_days * 24 * 60 * 60
+    budget = max_mb * 1024 * 1024
+    evicted = 0
+    with db:
+        for table, entry in _cache_tables.items():
+            if not entry["track_access"]:
+                continue
+            stale = db.execute(
+                f"SELECT {entry['key_column']} FROM {table} WHERE accessed_at < ?",
+                (cutoff,),
+            ).fetchall()
+            for (key,) in stale:
+                _delete_entry(db, table, key)
+            evicted += len(stale)
+        # Doc lists whose project lost its folder entry can no longer be used.
+        db.execute(
+            "DELETE FROM gp_docs WHERE project_key NOT IN (SELECT project_key FROM gp_folders)"
+        )
+
+        entries = sorted(
+            (
+                (accessed_at, table, key, size)
+                for table, entry in _cache_tables.items()
+                if entry["size_sql"]
+                for key, accessed_at, size in db.execute(entry["size_sql"])
+            ),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, _, _, size in entries)
+        for _, table, key, size in entries:
+            if total <= budget:
+                break
+            _delete_entry(db, table, key)
+            total -= size
+            evicted += 1
+    if evicted:
+        _memo.clear()
+        futil.log(f"{cmd_name}: evicted {evicted} cache entries")
+    return evicted
+
+
+def schedule_cache_maintenance() -> None:
+    """Queue one budget and orphan pass for idle time; later calls are no-ops."""
+    global _maintenance_scheduled
+    if _maintenance_scheduled:
+        return
+    _maintenance_scheduled = True
+    try:
+        _fire_at_idle(_MAINTENANCE_EVENT_ID, _on_cache_maintenance)
+    except Exception:
+        futil.log("cache_utils: could not schedule cache maintenance — ignoring")
+
+
+def _on_cache_maintenance(args: adsk.core.CustomEventArgs) -> None:
+    try:
+        db = cache_store()
+        if not _orphan_queue:
+            enforce_cache_budget()
+            row = db.execute(
+                "SELECT value FROM cache_meta WHERE key = 'orphan_sweep'"
+            ).fetchone()
+            if row and time.time() - row[0] < CACHE_ORPHAN_SWEEP_INTERVAL_S:
+                return
+            # Lookups are only meaningful in the hub an entry was written
+            # in; offline, or with no hub, nothing is swept this session.
+            hub_id = active_hub_id()
+            if hub_id is None:
+                return
+            for table, entry in _cache_tables.items():
+                if entry["files_sql"]:
+                    _orphan_queue.extend(
+                        (table, row[0], hub_id, row[2:])
+                        for row in db.execute(entry["files_sql"])
+                        if row[1] == hub_id
+                    )
+
+        started = time.perf_counter()
+        for _ in range(CACHE_ORPHAN_BATCH):
+            if not _orphan_queue or time.perf_counter() - started >= CACHE_ORPHAN_BUDGET_S:
+                break
+            table, key, hub_id, file_ids = _orphan_queue.pop(0)
+            if active_hub_id() != hub_id:
+                # Went offline or switched hub mid-sweep; retry next session.
+                _orphan_queue.clear()
+                _stop_orphan_resume()
+                return
+            if all(_data_file_exists(file_id) for file_id in file_ids):
+                continue
+            with db:
+                _delete_entry(db, table, key)
+            _memo_invalidate(table, key)
+            futil.log(f"cache_utils: removed orphaned {table} entry {key}")
+
+        if _orphan_queue:
+            _resume_orphan_sweep_later()
+        else:
+            _stop_orphan_resume()
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO cache_meta VALUES ('orphan_sweep', ?)",
+                    (time.time(),),
+                )
+    except Exception:
+        _orphan_queue.clear()
+        _stop_orphan_resume()
+        futil.log("cache_utils: cache maintenance failed — ignoring")
+
+
+def _resume_orphan_sweep_later() -> None:
+    """Continue the orphan sweep after each command ends until it is done."""
+    if not _orphan_resume_handlers:
+        add_handler(
+            app.userInterface.commandTerminated,
+            _on_command_terminated,
+            name="cache_utils commandTerminated",
+            local_handlers=_orphan_resume_handlers,
+        )
+
+
+def _on_command_terminated(args: adsk.core.ApplicationCommandEventArgs) -> None:
+    if _orphan_queue:
+        app.fireCustomEvent(_MAINTENANCE_EVENT_ID)
+
+
+def _stop_orphan_resume() -> None:
+    for handler in _orphan_resume_handlers:
+        try:
+            app.userInterface.commandTerminated.remove(handler)
+        except Exception:
+            pass
+    _orphan_resume_handlers.clear()
+
+
+def _data_file_exists(file_id: str) -> bool:
+    """Return False only when the Hub positively reports no such file.
+
+    Callers check first that Fusion is online and in the hub the entry was
+    written in, since findFileById also returns None for a file in another
+    hub.  A lookup that raises is a transient error and keeps the entry.
+    """
+    try:
+        return app.data.findFileById(file_id) is not None
+    except Exception:
+        return True
+
+
+def active_hub_id() -> str | None:
+    """Return the id of the active Hub, or None when offline or unavailable."""
+    try:
+        if app.isOffLine:
             return None
-        return payload.get("parameters", [])
+        hub = app.data.activeHub
+        return hub.id if hub else None
     except Exception:
         return None
 
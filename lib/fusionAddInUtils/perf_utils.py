@@ -0,0 +1,257 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+# Copyright (C) 2022-2026 IMA LLC
+
+"""Aggregated latency recording for interactive, preview-heavy commands.
+
+`perf_timer` writes one [PERF] line per timed block, which is unreadable at
+mouse-move rates. `LatencyRecorder` instead folds every event into a
+per-label histogram, keeps the slowest frames with an estimate of the
+Fusion API calls made in each, and writes a single JSON report on demand
+(typically from the command's destroy handler). append() instead adds one
+line per run to a JSON Lines metrics file, for commands whose runs are
+compared over time.
+
+No individual samples are kept, so the p50_ms and p95_ms figures in a
+report are upper bounds read from the histogram: the bound of the bucket
+holding that percentile, capped at max_ms (which is also the figure
+when the percentile lands in the overflow bucket).
+
+Usage:
+    _latency = futil.LatencyRecorder(CMD_ID)
+
+    @_latency.timed("command_mouse_move")
+    def command_mouse_move(args): ...
+
+    def command_destroy(args):
+        _latency.dump()
+
+Recording is gated on config.PERF_TRACE (like perf_timer) unless the
+recorder is created with enabled=True. A disabled recorder costs one
+attribute check per event. The default histogram buckets suit per-frame
+latencies; pass buckets_ms for phases that take seconds.
+"""
+
+import functools
+import heapq
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from .general_utils import PERF_TRACE, log
+from .log_utils import default_log_directory
+
+__all__ = ["LatencyRecorder"]
+
+# Histogram bucket upper bounds in milliseconds; a final open-ended bucket
+# catches everything slower than the last bound.
+LATENCY_BUCKETS_MS = (1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000)
+DEFAULT_WORST_FRAMES = 20
+
+# append() starts a new metrics file once the current one passes this size;
+# the previous file is kept as <name>_metrics.jsonl.1.
+METRICS_MAX_BYTES = 1024 * 1024
+
+
+class LatencyRecorder:
+    """Collects per-label timings, histograms, worst frames and API call estimates."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        enabled: bool | None = None,
+        worst_frames: int = DEFAULT_WORST_FRAMES,
+        buckets_ms: tuple[float, ...] = LATENCY_BUCKETS_MS,
+    ):
+        self.name = name
+        self.enabled = PERF_TRACE if enabled is None else enabled
+        self._worst_limit = worst_frames
+        self._buckets_ms = buckets_ms
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        self._stats: dict[str, dict] = {}
+        self._worst: list[tuple] = []  # min-heap of (ms, seq, label, api_calls)
+        self._stack: list[list] = []  # open frames: [label, api_calls]
+        self._seq = itertools.count()
+        self._started = time.time()
+
+    @contextmanager
+    def frame(self, label: str):
+        """Time the wrapped block as one frame of *label*."""
+        if not self.enabled:
+            yield
+            return
+        entry = [label, 0]
+        self._stack.append(entry)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            self._stack.pop()
+            self._record(label, elapsed_ms, entry[1])
+
+    def timed(self, label: str):
+        """Decorator form of frame() for event handlers and helpers."""
+
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with self.frame(label):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def estimate_api_calls(self, n: int = 1) -> None:
+        """Attribute an estimated *n* Fusion API calls to every frame currently open.
+
+        Calls are not intercepted: callers pass a hand-counted figure for the
+        code path they just ran, so the est_api_calls fields in the report
+        are per-path estimates, useful for comparing paths rather than as
+        exact counts.
+        """
+        if not self.enabled:
+            return
+        for entry in self._stack:
+            entry[1] += n
+
+    def _record(self, label: str, elapsed_ms: float, api_calls: int) -> None:
+        stats = self._stats.get(label)
+        if stats is None:
+            stats = {
+                "count": 0,
+                "total_ms": 0.0,
+                "min_ms": elapsed_ms,
+                "max_ms": elapsed_ms,
+                "est_api_calls": 0,
+                "max_est_api_calls": 0,
+                "buckets": [0] * (len(self._buckets_ms) + 1),
+            }
+            self._stats[label] = stats
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["min_ms"] = min(stats["min_ms"], elapsed_ms)
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["est_api_calls"] += api_calls
+        stats["max_est_api_calls"] = max(stats["max_est_api_calls"], api_calls)
+        stats["buckets"][_bucket_index(self._buckets_ms, elapsed_ms)] += 1
+
+        item = (elapsed_ms, next(self._seq), label, api_calls)
+        if len(self._worst) < self._worst_limit:
+            heapq.heappush(self._worst, item)
+        elif elapsed_ms > self._worst[0][0]:
+            heapq.heapreplace(self._worst, item)
+
+    def summary(self) -> dict:
+        """Return the aggregated report as a JSON-serialisable dict."""
+        bounds = self._buckets_ms
+        bucket_labels = [f"<={b}ms" for b in bounds] + [f">{bounds[-1]}ms"]
+        events = {}
+        for label, stats in self._stats.items():
+            count = stats["count"]
+            events[label] = {
+                "count": count,
+                "total_ms": round(stats["total_ms"], 3),
+                "mean_ms": round(stats["total_ms"] / count, 3),
+                "min_ms": round(stats["min_ms"], 3),
+                "max_ms": round(stats["max_ms"], 3),
+                "p50_ms": _bucket_percentile(bounds, stats, 0.50),
+                "p95_ms": _bucket_percentile(bounds, stats, 0.95),
+                "mean_est_api_calls": round(stats["est_api_calls"] / count, 1),
+                "max_est_api_calls": stats["max_est_api_calls"],
+                "histogram": dict(zip(bucket_labels, stats["buckets"])),
+            }
+        worst = [
+            {"label": label, "ms": round(ms, 3), "est_api_calls": calls, "seq": seq}
+            for ms, seq, label, calls in sorted(self._worst, reverse=True)
+        ]
+        return {
+            "name": self.name,
+            "started": datetime.fromtimestamp(self._started).isoformat(timespec="seconds"),
+            "duration_s": round(time.time() - self._started, 3),
+            "events": events,
+            "worst_frames": worst,
+        }
+
+    def dump(self, directory: str | None = None) -> str | None:
+        """Write the summary to a timestamped JSON file and return its path.
+
+        Returns None when recording is disabled, nothing was recorded, or the
+        file could not be written.
+        """
+        if not self.enabled or not self._stats:
+            return None
+        directory = directory or default_log_directory()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.name)
+        path = os.path.join(directory, f"{safe_name}_latency_{stamp}.json")
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(self.summary(), fh, indent=2)
+        except Exception as e:
+            log(f"[PERF] {self.name}: failed to write latency report: {e}")
+            return None
+        log(f"[PERF] {self.name}: latency report written → {path}")
+        return path
+
+    def append(self, directory: str | None = None, extra: dict | None = None) -> str | None:
+        """Append the summary as one line of <name>_metrics.jsonl; return its path.
+
+        *extra* is merged into the record (mode, document names, outcome).
+        The file is rolled over at METRICS_MAX_BYTES. Returns None under the
+        same conditions as dump().
+        """
+        if not self.enabled or not self._stats:
+            return None
+        directory = directory or default_log_directory()
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in self.name)
+        path = os.path.join(directory, f"{safe_name}_metrics.jsonl")
+        record = self.summary()
+        record.pop("worst_frames", None)
+        for stats in record["events"].values():
+            stats.pop("histogram", None)
+        record.update(extra or {})
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) > METRICS_MAX_BYTES:
+                os.replace(path, path + ".1")
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        except Exception as e:
+            log(f"[PERF] {self.name}: failed to append metrics: {e}")
+            return None
+        return path
+
+
+def _bucket_index(bounds: tuple[float, ...], elapsed_ms: float) -> int:
+    for i, bound in enumerate(bounds):
+        if elapsed_ms <= bound:
+            return i
+    return len(bounds)
+
+
+def _bucket_percentile(bounds: tuple[float, ...], stats: dict, fraction: float) -> float:
+    """Return an upper bound (ms) for the given percentile of *stats*.
+
+    That is the bound of the bucket containing the percentile, capped at
+    the observed maximum; in the open-ended overflow bucket it is the
+    maximum itself.
+    """
+    buckets = stats["buckets"]
+    threshold = stats["count"] * fraction
+    running = 0
+    for i, n in enumerate(buckets[:-1]):
+        running += n
+        if running >= threshold:
+            return round(min(float(bounds[i]), stats["max_ms"]), 3)
+    return round(stats["max_ms"], 3)
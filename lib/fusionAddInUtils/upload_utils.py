@@ -48,7 +48,10 @@ def wait_for_upload(
 
     For the bool path, pass `document` (and optionally `pre_save_version`)
     so the helper has something to poll. Without `document`, a True bool
-    is taken at face value.
+    is taken at face value. With `pre_save_version` (0 for a document that
+    was never saved), success means the cloud data file reached a higher
+    version; isSaved/isModified settling alone is not enough, and the wait
+    fails on timeout.
 
     `log_fn`, if provided, is called with status strings (entry, heartbeats).
     Use it to surface progress in the caller's log file.
@@ -246,17 +249,15 @@ def _wait_via_document_state(
     stable_ready_checks = 0
 
     data_file_id = None
-    try:
-        if document.dataFile:
-            data_file_id = document.dataFile.id
-    except Exception:
-        data_file_id = None
 
     while True:
         adsk.doEvents()
 
         current_version = None
         try:
+            # A first saveAs only gets its data file once the upload starts.
+            if not data_file_id and document.dataFile:
+                data_file_id = document.dataFile.id
             if data_file_id:
                 refreshed = app.data.findFileById(data_file_id)
                 if refreshed and hasattr(refreshed, "versionNumber"):
@@ -283,7 +284,12 @@ def _wait_via_document_state(
 
         doc_is_saved = getattr(document, "isSaved", None)
         doc_is_modified = getattr(document, "isModified", None)
-        if doc_is_saved is True and doc_is_modified is False:
+        # With a pre-save version, only a new cloud version confirms the upload.
+        if (
+            pre_save_version is None
+            and doc_is_saved is True
+            and doc_is_modified is False
+        ):
             stable_ready_checks += 1
             if stable_since is None:
                 stable_since = time.monotonic()
@@ -311,6 +317,8 @@ def _wait_via_document_state(
             msg = (
                 f"Save wait timed out for {context_label} after {timeout_seconds}s"
             )
+            if pre_save_version is not None:
+                msg += f" without a version after {pre_save_version}"
             log(f"[wait_for_upload] {msg}")
             return False, msg
 